@@ -19,6 +19,8 @@ logging.basicConfig(
 
 from . import models, cron, views  # noqa: F401 isort:skip
 from .bill import views as bill_views  # noqa: F401 isort:skip
+from .email_outbox import outbox as email_outbox  # noqa: F401 isort:skip
 from .person import views as person_views  # noqa: F401 isort:skip
+from .power_hour_jobs import runner as power_hour_jobs  # noqa: F401 isort:skip
 from .sponsorship import views as sponsorship_views  # noqa: F401 isort:skip
 from .user import views as user_views  # noqa: F401 isort:skip
@@ -1,7 +1,16 @@
 import enum
 from uuid import uuid4
 
-from sqlalchemy import Column, Enum, ForeignKey, Integer, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Text,
+    sql,
+)
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import relationship
@@ -77,9 +86,23 @@ class Bill(db.Model):
     power_hours = relationship(
         "PowerHour", back_populates="bill", cascade="all, delete"
     )
+    power_hour_jobs = relationship(
+        "PowerHourJob", back_populates="bill", cascade="all, delete"
+    )
     attachments = relationship(
         "BillAttachment", back_populates="bill", cascade="all, delete"
     )
+    snapshots = relationship(
+        "BillSnapshot", back_populates="bill", cascade="all, delete"
+    )
+    notification_subscriptions = relationship(
+        "NotificationSubscription",
+        back_populates="bill",
+        cascade="all, delete",
+    )
+
+    # For paging through the bill list, which is ordered by name
+    __table_args__ = (Index("ix_bills_name_id", name, id),)
 
     @property
     def display_name(self):
@@ -185,6 +208,14 @@ class CityBill(db.Model):
     # Committee name
     council_body = Column(Text)
 
+    # The API's MatterLastModifiedUtc as of the last time we pulled this bill.
+    # If the API reports a later one, the bill needs to be refreshed.
+    last_modified_at = Column(TIMESTAMP)
+
+    # When we last confirmed this bill was up to date with the API. Incremental
+    # syncs only ask for matters modified since the oldest of these.
+    synced_at = Column(TIMESTAMP, default=now)
+
 
 # TODO: Understand bill substitution and change if needed
 class StateBill(db.Model):
@@ -200,6 +231,10 @@ class StateBill(db.Model):
     # The start of the 2-year legislative session this belongs to.
     session_year = Column(Integer, nullable=False)
 
+    # When we last confirmed this bill was up to date with the API. Incremental
+    # syncs only ask for bill updates processed since the oldest of these.
+    synced_at = Column(TIMESTAMP)
+
     senate_bill = relationship(
         "SenateBill",
         back_populates="state_bill",
@@ -260,3 +295,35 @@ class AssemblyBill(db.Model, StateChamberMixin):
         back_populates="bill",
         cascade="all, delete-orphan",
     )
+
+
+class BillSnapshot(db.Model):
+    """
+    The status and sponsors of a city bill, or of one chamber of a state bill,
+    as of the last time we checked it for changes to notify users about.
+
+    The content_hash covers the status and sponsors, so that finding which
+    bills changed only needs the hashes. The full snapshot is only read for
+    the bills that did change.
+
+    The daily digest keeps its own set of snapshots, as of the last digest."""
+
+    __tablename__ = "bill_snapshots"
+
+    class Chamber(enum.Enum):
+        CITY = 1
+        SENATE = 2
+        ASSEMBLY = 3
+
+    bill_id = Column(UUID, ForeignKey(Bill.id), primary_key=True)
+    bill = relationship(Bill, back_populates="snapshots")
+    chamber = Column(Enum(Chamber), primary_key=True)
+    is_digest = Column(Boolean, primary_key=True, server_default=sql.false())
+
+    status = Column(Text, nullable=False)
+
+    # Sorted, so that the same sponsors always produce the same hash
+    sponsor_person_ids = Column(ARRAY(UUID), nullable=False)
+
+    content_hash = Column(Text, nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=False, default=now)
@@ -1,6 +1,7 @@
-from marshmallow import fields
+from marshmallow import fields, validate
 from marshmallow_enum import EnumField
 
+from ..power_hour_jobs.models import PowerHourJob
 from ..schema import CamelCaseSchema
 from .models import Bill, StateChamber
 
@@ -56,6 +57,24 @@ class BillSchema(CamelCaseSchema):
     state_bill = fields.Nested(StateBillSchema)
 
 
+class BillListArgsSchema(CamelCaseSchema):
+    """Query string arguments for listing bills"""
+
+    # Pagination is opt-in, so that clients that want every bill still get
+    # them in one response
+    limit = fields.Integer(validate=validate.Range(min=1, max=500))
+    # The X-Next-Cursor header from the previous page
+    after = fields.String()
+
+    type = EnumField(Bill.BillType)
+    session_year = fields.Integer()
+    status = fields.String()
+    changed_since = fields.DateTime()
+
+    # Comma-separated BillSchema field names, like "id,name,cityBill"
+    fields_ = fields.String(data_key="fields")
+
+
 class StateBillSearchResultSchema(CamelCaseSchema):
     name = fields.String(dump_only=True)
     description = fields.String(dump_only=True)
@@ -85,6 +104,11 @@ class PowerHourSchema(CamelCaseSchema):
     created_at = fields.DateTime()
 
 
-class CreatePowerHourSchema(CamelCaseSchema):
-    power_hour = fields.Nested(PowerHourSchema)
+class PowerHourJobSchema(CamelCaseSchema):
+    id = fields.UUID()
+    status = EnumField(PowerHourJob.Status)
     messages = fields.List(fields.String())
+    error = fields.String()
+
+    # Only set once the job succeeds
+    power_hour = fields.Nested(PowerHourSchema)
@@ -1,7 +1,13 @@
+import json
 import logging
-from uuid import uuid4
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from uuid import UUID, uuid4
 
 from flask import jsonify, request
+from marshmallow import ValidationError
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.orm import joinedload, lazyload
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug import exceptions
 
 from .. import state_api
@@ -9,20 +15,30 @@ from ..app import app
 from ..auth import auth_required
 from ..council_api import lookup_bill, lookup_bills
 from ..council_sync import update_bill_sponsorships
-from ..google_sheets import create_power_hour
 from ..models import db
+from ..power_hour_jobs.models import PowerHourJob
+from ..power_hour_jobs.runner import enqueue_power_hour_job
+from ..resource_versions.tracking import conditional_get
+from ..sponsorship.models import (
+    AssemblySponsorship,
+    CitySponsorship,
+    SenateSponsorship,
+)
 from .models import (
     AssemblyBill,
     Bill,
     BillAttachment,
+    BillSnapshot,
     CityBill,
     PowerHour,
     SenateBill,
+    StateBill,
 )
 from .schema import (
     BillAttachmentSchema,
+    BillListArgsSchema,
     BillSchema,
-    CreatePowerHourSchema,
+    PowerHourJobSchema,
     PowerHourSchema,
     StateBillSearchResultSchema,
     TrackCityBillSchema,
@@ -32,15 +48,190 @@ from .schema import (
 # Views ----------------------------------------------------------------------
 
 
+# The tables BillSchema draws from, including for the sponsor counts
+BILL_MODELS = (
+    Bill,
+    CityBill,
+    StateBill,
+    SenateBill,
+    AssemblyBill,
+    CitySponsorship,
+    SenateSponsorship,
+    AssemblySponsorship,
+)
+
+# BillSchema fields that need the chamber bills, and so their sponsor counts
+CHAMBER_BILL_FIELDS = {"city_bill", "state_bill", "status", "code_name"}
+
+
+def _encode_bill_cursor(bill):
+    cursor = json.dumps([bill.name, str(bill.id)])
+    return urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+
+
+def _decode_bill_cursor(cursor):
+    try:
+        name, bill_id = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+        return name, UUID(bill_id)
+    except (ValueError, TypeError):
+        raise exceptions.UnprocessableEntity(f"Invalid cursor: {cursor}")
+
+
+def _get_bill_list_fields(fields_arg):
+    """Maps comma-separated camel-case field names to BillSchema's"""
+    names_by_data_key = {
+        field.data_key: name for name, field in BillSchema().fields.items()
+    }
+    try:
+        return {
+            names_by_data_key[data_key.strip()]
+            for data_key in fields_arg.split(",")
+        }
+    except KeyError as e:
+        raise exceptions.UnprocessableEntity(f"Unknown bill field: {e}")
+
+
+def _filter_bills(query, args):
+    if "type" in args:
+        query = query.filter(Bill.type == args["type"])
+    if "session_year" in args:
+        query = query.filter(
+            Bill.state_bill.has(StateBill.session_year == args["session_year"])
+        )
+    if "status" in args:
+        status = args["status"]
+        query = query.filter(
+            or_(
+                Bill.city_bill.has(CityBill.status == status),
+                Bill.state_bill.has(
+                    or_(
+                        StateBill.senate_bill.has(SenateBill.status == status),
+                        StateBill.assembly_bill.has(
+                            AssemblyBill.status == status
+                        ),
+                    )
+                ),
+            )
+        )
+    if "changed_since" in args:
+        # The notification snapshots are only rewritten when a bill's status
+        # or sponsors change
+        query = query.filter(
+            Bill.snapshots.any(
+                and_(
+                    BillSnapshot.is_digest.is_(False),
+                    BillSnapshot.updated_at >= args["changed_since"],
+                )
+            )
+        )
+    return query
+
+
+def _get_sponsor_counts(sponsorship_model, bill_ids):
+    return (
+        select(
+            sponsorship_model.bill_id,
+            func.count().label("sponsor_count"),
+        )
+        .where(sponsorship_model.bill_id.in_(select(bill_ids.c.id)))
+        .group_by(sponsorship_model.bill_id)
+        .subquery()
+    )
+
+
+def _set_sponsor_count(chamber_bill, sponsor_count):
+    # Sets it as if it had been loaded, so the bill isn't marked as modified
+    if chamber_bill:
+        set_committed_value(chamber_bill, "sponsor_count", sponsor_count)
+
+
+def _query_bills_with_sponsor_counts(bill_query):
+    """Loads the bills from the given query with their chamber bills and each
+    chamber's sponsor count, all in one query. The counts come from grouped
+    subqueries, limited to just those bills, rather than the deferred
+    sponsor_count properties, which would be a subquery per row."""
+    bill_ids = bill_query.with_entities(Bill.id).cte("page_bill_ids")
+    city_counts = _get_sponsor_counts(CitySponsorship, bill_ids)
+    senate_counts = _get_sponsor_counts(SenateSponsorship, bill_ids)
+    assembly_counts = _get_sponsor_counts(AssemblySponsorship, bill_ids)
+
+    query = (
+        db.session.query(
+            Bill,
+            func.coalesce(city_counts.c.sponsor_count, 0),
+            func.coalesce(senate_counts.c.sponsor_count, 0),
+            func.coalesce(assembly_counts.c.sponsor_count, 0),
+        )
+        .join(bill_ids, bill_ids.c.id == Bill.id)
+        .outerjoin(city_counts, city_counts.c.bill_id == Bill.id)
+        .outerjoin(senate_counts, senate_counts.c.bill_id == Bill.id)
+        .outerjoin(assembly_counts, assembly_counts.c.bill_id == Bill.id)
+        .options(
+            joinedload(Bill.city_bill),
+            joinedload(Bill.state_bill).joinedload(StateBill.senate_bill),
+            joinedload(Bill.state_bill).joinedload(StateBill.assembly_bill),
+        )
+        .order_by(Bill.name, Bill.id)
+    )
+
+    bills = []
+    for bill, city_count, senate_count, assembly_count in query:
+        _set_sponsor_count(bill.city_bill, city_count)
+        if bill.state_bill:
+            _set_sponsor_count(bill.state_bill.senate_bill, senate_count)
+            _set_sponsor_count(bill.state_bill.assembly_bill, assembly_count)
+        bills.append(bill)
+    return bills
+
+
 @app.route("/api/bills", methods=["GET"])
 @auth_required
+@conditional_get(*BILL_MODELS, BillSnapshot)
 def bills():
-    bills = Bill.query.order_by(Bill.name).all()
-    return BillSchema(many=True).jsonify(bills)
+    """Lists bills ordered by name. Takes optional filters, a fields list,
+    and a limit. When there are more bills than the limit, the X-Next-Cursor
+    header has the `after` argument for the next page."""
+    try:
+        args = BillListArgsSchema().load(request.args)
+    except ValidationError as e:
+        raise exceptions.UnprocessableEntity(str(e.messages))
+
+    only = (
+        _get_bill_list_fields(args["fields_"]) if "fields_" in args else None
+    )
+    limit = args.get("limit")
+
+    bill_query = _filter_bills(Bill.query, args)
+    if "after" in args:
+        bill_query = bill_query.filter(
+            tuple_(Bill.name, Bill.id) > _decode_bill_cursor(args["after"])
+        )
+    bill_query = bill_query.order_by(Bill.name, Bill.id)
+    if limit:
+        # One extra to find out whether there's another page
+        bill_query = bill_query.limit(limit + 1)
+
+    if only is None or only & CHAMBER_BILL_FIELDS:
+        bills = _query_bills_with_sponsor_counts(bill_query)
+    else:
+        bills = bill_query.options(
+            lazyload(Bill.city_bill), lazyload(Bill.state_bill)
+        ).all()
+
+    next_cursor = None
+    if limit and len(bills) > limit:
+        bills = bills[:limit]
+        next_cursor = _encode_bill_cursor(bills[-1])
+
+    response = BillSchema(many=True, only=only).jsonify(bills)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 @app.route("/api/bills/<uuid:bill_id>", methods=["GET"])
 @auth_required
+@conditional_get(*BILL_MODELS)
 def get_bill(bill_id):
     bill = Bill.query.get(bill_id)
     return BillSchema().jsonify(bill)
@@ -202,6 +393,11 @@ def bill_power_hours(bill_id):
 )
 @auth_required
 def create_spreadsheet(bill_id):
+    """Queues the spreadsheet to be created in the background. Poll the
+    returned job for the result."""
+    if not Bill.query.get(bill_id):
+        raise exceptions.NotFound()
+
     data = PowerHourSchema().load(request.json)
     power_hour_id_to_import = data.get("power_hour_id_to_import")
     if power_hour_id_to_import:
@@ -210,22 +406,17 @@ def create_spreadsheet(bill_id):
     else:
         old_spreadsheet_id = None
 
-    spreadsheet, messages = create_power_hour(
-        bill_id, data["title"], old_spreadsheet_id
-    )
+    job = enqueue_power_hour_job(bill_id, data["title"], old_spreadsheet_id)
+    return PowerHourJobSchema().jsonify(job), 202
 
-    power_hour = PowerHour(
-        bill_id=bill_id,
-        spreadsheet_url=spreadsheet["spreadsheetUrl"],
-        spreadsheet_id=spreadsheet["spreadsheetId"],
-        title=data["title"],
-    )
-    db.session.add(power_hour)
-    db.session.commit()
 
-    return CreatePowerHourSchema().jsonify(
-        {"messages": messages, "power_hour": power_hour}
-    )
+@app.route("/api/power-hour-jobs/<uuid:job_id>", methods=["GET"])
+@auth_required
+def get_power_hour_job(job_id):
+    job = PowerHourJob.query.get(job_id)
+    if not job:
+        raise exceptions.NotFound()
+    return PowerHourJobSchema().jsonify(job)
 
 
 @app.route("/api/bills/<uuid:bill_id>/attachments", methods=["GET"])
@@ -1,15 +1,41 @@
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Union
+from datetime import timedelta
+from hashlib import sha256
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 from uuid import UUID
+from zoneinfo import ZoneInfo
 
-from botocore.exceptions import ClientError
 from flask import render_template
-
-from .bill.views import AssemblyBill, Bill, SenateBill
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload, selectinload
+
+from .bill.models import (
+    AssemblyBill,
+    Bill,
+    BillSnapshot,
+    CityBill,
+    SenateBill,
+    StateBill,
+)
+from .email_outbox.outbox import QueuedEmail, enqueue_emails
+from .models import db
 from .person.models import Person
-from .ses import send_email
-from .user.models import User
+from .sponsorship.models import (
+    AssemblySponsorship,
+    CitySponsorship,
+    SenateSponsorship,
+)
+from .user.models import NotificationSubscription, User
+from .utils import now
+
+
+NEW_YORK_TIMEZONE = ZoneInfo("America/New_York")
+
+# The local hour when daily digests go out, or the first cron run after it
+DAILY_DIGEST_HOUR = 8
 
 
 @dataclass
@@ -24,9 +50,15 @@ class GenericBillDiff:
     removed_sponsor_names: List[str] = None
     current_sponsor_count: int = None
 
+    bill_id: UUID = None
     bill_number: str = None
     bill_name: str = None
 
+    # The person IDs behind the sponsor names. The diffs are calculated from
+    # these first, and then all of the names are looked up together.
+    added_sponsor_ids: Set[UUID] = None
+    removed_sponsor_ids: Set[UUID] = None
+
 
 @dataclass
 class StateBillDiff:
@@ -62,44 +94,53 @@ class SnapshotState:
     state_snapshots: Dict[UUID, StateBillSnapshot] = None
 
 
-def _snapshot_state_bill_chamber(
-    chamber_bill: Optional[Union[SenateBill, AssemblyBill]]
-) -> Optional[GenericBillSnapshot]:
-    if not chamber_bill:
-        return None
-
-    sponsor_ids = set((s.person_id for s in chamber_bill.sponsorships))
-    status = chamber_bill.status
+def _snapshot_chamber(
+    chamber_model: Union[CityBill, SenateBill, AssemblyBill],
+    sponsorship_model: Union[
+        CitySponsorship, SenateSponsorship, AssemblySponsorship
+    ],
+    sponsor_person_id_column,
+) -> Dict[UUID, GenericBillSnapshot]:
+    """Snapshots every bill in the city council or one state chamber, keyed by
+    bill ID. Uses one query for the statuses and one for the sponsors, however
+    many bills there are."""
+    snapshots = {
+        bill_id: GenericBillSnapshot(status=status, sponsor_person_ids=set())
+        for bill_id, status in db.session.query(
+            chamber_model.bill_id, chamber_model.status
+        )
+    }
+    for bill_id, person_id in db.session.query(
+        sponsorship_model.bill_id, sponsor_person_id_column
+    ):
+        if bill_id in snapshots:
+            snapshots[bill_id].sponsor_person_ids.add(person_id)
 
-    return GenericBillSnapshot(status=status, sponsor_person_ids=sponsor_ids)
+    return snapshots
 
 
 def snapshot_bills() -> SnapshotState:
     """Snapshots the state of all bills. Used to calculate the diff produced by
     a cron job run, so that we can send out email notifications of bill status changes."""
+    senate_snapshots = _snapshot_chamber(
+        SenateBill, SenateSponsorship, SenateSponsorship.person_id
+    )
+    assembly_snapshots = _snapshot_chamber(
+        AssemblyBill, AssemblySponsorship, AssemblySponsorship.person_id
+    )
 
-    snapshot_state = SnapshotState(city_snapshots={}, state_snapshots={})
-
-    # FIXME: This is doing a lot of lazy loading of sponsorships
-    bills = Bill.query.all()
-    for bill in bills:
-        if bill.type == Bill.BillType.CITY:
-            sponsor_ids = set(
-                (s.council_member_id for s in bill.city_bill.sponsorships)
+    return SnapshotState(
+        city_snapshots=_snapshot_chamber(
+            CityBill, CitySponsorship, CitySponsorship.council_member_id
+        ),
+        state_snapshots={
+            bill_id: StateBillSnapshot(
+                senate_snapshot=senate_snapshots.get(bill_id),
+                assembly_snapshot=assembly_snapshots.get(bill_id),
             )
-            snapshot = GenericBillSnapshot(bill.city_bill.status, sponsor_ids)
-            snapshot_state.city_snapshots[bill.id] = snapshot
-        else:
-            snapshot_state.state_snapshots[bill.id] = StateBillSnapshot(
-                senate_snapshot=_snapshot_state_bill_chamber(
-                    bill.state_bill.senate_bill
-                ),
-                assembly_snapshot=_snapshot_state_bill_chamber(
-                    bill.state_bill.assembly_bill
-                ),
-            )
-
-    return snapshot_state
+            for bill_id in senate_snapshots.keys() | assembly_snapshots.keys()
+        },
+    )
 
 
 def _get_sponsor_subject_string(sponsors):
@@ -241,62 +282,254 @@ def _calculate_bill_diff(
     snapshot: GenericBillSnapshot,
     current_sponsor_ids: Set[UUID],
     new_status,
+    bill_id: UUID,
     bill_number: str,
     bill_name: Optional[str],
 ) -> Optional[GenericBillDiff]:
     """Looks at the before and after states of a single bill and computes a diff
-    that's useful for sending email notifications."""
+    that's useful for sending email notifications. The sponsor names are
+    filled in afterwards by _fill_sponsor_names."""
 
     added_sponsor_ids = current_sponsor_ids - snapshot.sponsor_person_ids
     removed_sponsor_ids = snapshot.sponsor_person_ids - current_sponsor_ids
 
-    changed_persons = Person.query.filter(
-        Person.id.in_(added_sponsor_ids.union(removed_sponsor_ids))
-    ).all()
-    added_sponsor_names = [
-        p.name for p in changed_persons if p.id in added_sponsor_ids
-    ]
-    removed_sponsor_names = [
-        p.name for p in changed_persons if p.id in removed_sponsor_ids
-    ]
-
     if (
-        removed_sponsor_names
-        or added_sponsor_names
+        removed_sponsor_ids
+        or added_sponsor_ids
         or new_status != snapshot.status
     ):
         return GenericBillDiff(
             old_status=snapshot.status,
             new_status=new_status,
-            added_sponsor_names=added_sponsor_names,
-            removed_sponsor_names=removed_sponsor_names,
             current_sponsor_count=len(current_sponsor_ids),
+            bill_id=bill_id,
             bill_number=bill_number,
             bill_name=bill_name,
+            added_sponsor_ids=added_sponsor_ids,
+            removed_sponsor_ids=removed_sponsor_ids,
         )
 
     return None
 
 
-def _calculate_all_bill_diffs(snapshot_state: SnapshotState) -> BillDiffSet:
+def _fill_sponsor_names(diffs: List[GenericBillDiff]):
+    """Looks up the names of every added and removed sponsor across all the
+    diffs in a single query."""
+    person_ids = set().union(
+        *(d.added_sponsor_ids | d.removed_sponsor_ids for d in diffs)
+    )
+    names_by_id = (
+        dict(
+            db.session.query(Person.id, Person.name).filter(
+                Person.id.in_(person_ids)
+            )
+        )
+        if person_ids
+        else {}
+    )
+
+    for diff in diffs:
+        diff.added_sponsor_names = sorted(
+            names_by_id[id]
+            for id in diff.added_sponsor_ids
+            if id in names_by_id
+        )
+        diff.removed_sponsor_names = sorted(
+            names_by_id[id]
+            for id in diff.removed_sponsor_ids
+            if id in names_by_id
+        )
+
+
+def _iterate_chamber_snapshots(
+    snapshot_state: SnapshotState,
+) -> Iterator[Tuple[UUID, BillSnapshot.Chamber, GenericBillSnapshot]]:
+    for bill_id, snapshot in snapshot_state.city_snapshots.items():
+        yield bill_id, BillSnapshot.Chamber.CITY, snapshot
+    for bill_id, state_snapshot in snapshot_state.state_snapshots.items():
+        if state_snapshot.senate_snapshot:
+            yield (
+                bill_id,
+                BillSnapshot.Chamber.SENATE,
+                state_snapshot.senate_snapshot,
+            )
+        if state_snapshot.assembly_snapshot:
+            yield (
+                bill_id,
+                BillSnapshot.Chamber.ASSEMBLY,
+                state_snapshot.assembly_snapshot,
+            )
+
+
+def _get_content_hash(snapshot: GenericBillSnapshot):
+    content = "\n".join(
+        [
+            snapshot.status,
+            *sorted(str(id) for id in snapshot.sponsor_person_ids),
+        ]
+    )
+    return sha256(content.encode("utf-8")).hexdigest()
+
+
+def _save_snapshots(snapshot_state: SnapshotState, *, is_digest=False):
+    """Stores the given snapshots, replacing any existing ones for the same
+    bills and chambers. Doesn't commit."""
+    rows = [
+        {
+            "bill_id": bill_id,
+            "chamber": chamber,
+            "is_digest": is_digest,
+            "status": snapshot.status,
+            "sponsor_person_ids": sorted(snapshot.sponsor_person_ids),
+            "content_hash": _get_content_hash(snapshot),
+            "updated_at": now(),
+        }
+        for bill_id, chamber, snapshot in _iterate_chamber_snapshots(
+            snapshot_state
+        )
+    ]
+    if not rows:
+        return
+
+    statement = insert(BillSnapshot).values(rows)
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                BillSnapshot.bill_id,
+                BillSnapshot.chamber,
+                BillSnapshot.is_digest,
+            ],
+            set_={
+                c: statement.excluded[c]
+                for c in [
+                    "status",
+                    "sponsor_person_ids",
+                    "content_hash",
+                    "updated_at",
+                ]
+            },
+        )
+    )
+
+
+def _load_changed_snapshots(
+    current_state: SnapshotState, *, is_digest=False
+) -> Tuple[SnapshotState, SnapshotState, str]:
+    """Compares the current state of the bills with their stored snapshots by
+    hash. Returns the stored snapshots of the bills that changed, and the
+    current snapshots of those bills plus any that weren't stored yet.
+
+    Also returns an ID for this set of changes, made from the stored
+    snapshots it replaces. Any other process that sees the same changes gets
+    the same ID."""
+    stored_hashes = {
+        (bill_id, chamber): content_hash
+        for bill_id, chamber, content_hash in db.session.query(
+            BillSnapshot.bill_id,
+            BillSnapshot.chamber,
+            BillSnapshot.content_hash,
+        ).filter(BillSnapshot.is_digest == is_digest)
+    }
+
+    changed_keys = []
+    changed_state = SnapshotState(city_snapshots={}, state_snapshots={})
+    for bill_id, chamber, snapshot in _iterate_chamber_snapshots(
+        current_state
+    ):
+        stored_hash = stored_hashes.get((bill_id, chamber))
+        if stored_hash == _get_content_hash(snapshot):
+            continue
+
+        if stored_hash:
+            changed_keys.append((bill_id, chamber))
+        if chamber == BillSnapshot.Chamber.CITY:
+            changed_state.city_snapshots[bill_id] = snapshot
+        else:
+            changed_state.state_snapshots[
+                bill_id
+            ] = current_state.state_snapshots[bill_id]
+
+    previous_state = SnapshotState(city_snapshots={}, state_snapshots={})
+    replaced_versions = []
+    if changed_keys:
+        for stored in BillSnapshot.query.filter(
+            BillSnapshot.is_digest == is_digest,
+            tuple_(BillSnapshot.bill_id, BillSnapshot.chamber).in_(
+                changed_keys
+            ),
+        ):
+            snapshot = GenericBillSnapshot(
+                status=stored.status,
+                sponsor_person_ids=set(stored.sponsor_person_ids),
+            )
+            replaced_versions.append(
+                f"{stored.bill_id}:{stored.chamber.name}:{stored.updated_at.isoformat()}"
+            )
+            if stored.chamber == BillSnapshot.Chamber.CITY:
+                previous_state.city_snapshots[stored.bill_id] = snapshot
+                continue
+
+            state_snapshot = previous_state.state_snapshots.setdefault(
+                stored.bill_id, StateBillSnapshot()
+            )
+            if stored.chamber == BillSnapshot.Chamber.SENATE:
+                state_snapshot.senate_snapshot = snapshot
+            else:
+                state_snapshot.assembly_snapshot = snapshot
+
+    change_id = sha256(
+        "\n".join(sorted(replaced_versions)).encode("utf-8")
+    ).hexdigest()
+    return previous_state, changed_state, change_id
+
+
+def _calculate_all_bill_diffs(
+    snapshot_state: SnapshotState,
+    current_state: Optional[SnapshotState] = None,
+) -> BillDiffSet:
     """
     Compares the current state of all tracked bills with a snapshot of their recent
     previous state, and creates a diff that describes the important information needed
     to send an email notification about any changes.
+
+    Only the bills in snapshot_state are compared, so it may hold just the
+    ones known to have changed.
     """
-    bills = Bill.query.all()
+    if current_state is None:
+        current_state = snapshot_bills()
+
+    # Only the bills that changed need to be loaded in full. Bills that were
+    # added since the snapshot was taken have nothing to compare against.
+    changed_bill_ids = [
+        bill_id
+        for old_snapshots, current_snapshots in (
+            (snapshot_state.city_snapshots, current_state.city_snapshots),
+            (snapshot_state.state_snapshots, current_state.state_snapshots),
+        )
+        for bill_id, current_snapshot in current_snapshots.items()
+        if bill_id in old_snapshots
+        and old_snapshots[bill_id] != current_snapshot
+    ]
+    bills = (
+        Bill.query.filter(Bill.id.in_(changed_bill_ids))
+        .options(
+            joinedload(Bill.state_bill).joinedload(StateBill.senate_bill),
+            joinedload(Bill.state_bill).joinedload(StateBill.assembly_bill),
+        )
+        .all()
+        if changed_bill_ids
+        else []
+    )
 
     bill_diffs = BillDiffSet(state_diffs=[], city_diffs=[])
     for bill in bills:
         if bill.type == Bill.BillType.CITY:
-            snapshot = snapshot_state.city_snapshots[bill.id]
-            current_sponsor_ids = set(
-                (s.council_member_id for s in bill.city_bill.sponsorships)
-            )
+            current_snapshot = current_state.city_snapshots[bill.id]
             diff = _calculate_bill_diff(
-                snapshot=snapshot,
-                current_sponsor_ids=current_sponsor_ids,
-                new_status=bill.city_bill.status,
+                snapshot=snapshot_state.city_snapshots[bill.id],
+                current_sponsor_ids=current_snapshot.sponsor_person_ids,
+                new_status=current_snapshot.status,
+                bill_id=bill.id,
                 bill_number=bill.city_bill.file,
                 bill_name=bill.display_name,
             )
@@ -304,37 +537,30 @@ def _calculate_all_bill_diffs(snapshot_state: SnapshotState) -> BillDiffSet:
                 bill_diffs.city_diffs.append(diff)
         else:
             snapshot = snapshot_state.state_snapshots[bill.id]
-            if bill.state_bill.senate_bill:
+            current_snapshot = current_state.state_snapshots[bill.id]
+            senate_diff = None
+            assembly_diff = None
+            if snapshot.senate_snapshot and current_snapshot.senate_snapshot:
                 senate_diff = _calculate_bill_diff(
                     snapshot=snapshot.senate_snapshot,
-                    current_sponsor_ids=set(
-                        (
-                            s.person_id
-                            for s in bill.state_bill.senate_bill.sponsorships
-                        )
-                    ),
-                    new_status=bill.state_bill.senate_bill.status,
+                    current_sponsor_ids=current_snapshot.senate_snapshot.sponsor_person_ids,
+                    new_status=current_snapshot.senate_snapshot.status,
+                    bill_id=bill.id,
                     bill_number=bill.state_bill.senate_bill.base_print_no,
                     bill_name=bill.display_name,
                 )
-            else:
-                senate_diff = None
-
-            if bill.state_bill.assembly_bill:
+            if (
+                snapshot.assembly_snapshot
+                and current_snapshot.assembly_snapshot
+            ):
                 assembly_diff = _calculate_bill_diff(
                     snapshot=snapshot.assembly_snapshot,
-                    current_sponsor_ids=set(
-                        (
-                            s.person_id
-                            for s in bill.state_bill.assembly_bill.sponsorships
-                        )
-                    ),
-                    new_status=bill.state_bill.assembly_bill.status,
+                    current_sponsor_ids=current_snapshot.assembly_snapshot.sponsor_person_ids,
+                    new_status=current_snapshot.assembly_snapshot.status,
+                    bill_id=bill.id,
                     bill_number=bill.state_bill.assembly_bill.base_print_no,
                     bill_name=bill.display_name,
                 )
-            else:
-                assembly_diff = None
 
             if senate_diff or assembly_diff:
                 bill_diffs.state_diffs.append(
@@ -343,25 +569,195 @@ def _calculate_all_bill_diffs(snapshot_state: SnapshotState) -> BillDiffSet:
                     )
                 )
 
+    _fill_sponsor_names(
+        bill_diffs.city_diffs
+        + [
+            chamber_diff
+            for state_diff in bill_diffs.state_diffs
+            for chamber_diff in (
+                state_diff.senate_diff,
+                state_diff.assembly_diff,
+            )
+            if chamber_diff
+        ]
+    )
     return bill_diffs
 
 
-def send_bill_update_notifications(
-    snapshots_by_bill_id,
+def _filter_bill_diffs(
+    bill_diffs: BillDiffSet, subscriptions: List[NotificationSubscription]
+) -> BillDiffSet:
+    """Returns just the diffs that match any of the subscriptions, or all of
+    them if there are no subscriptions."""
+    if not subscriptions:
+        return bill_diffs
+
+    def matches(diff, chamber):
+        return diff and any(
+            s.matches(diff.bill_id, chamber) for s in subscriptions
+        )
+
+    state_diffs = []
+    for state_diff in bill_diffs.state_diffs:
+        filtered_diff = StateBillDiff(
+            senate_diff=state_diff.senate_diff
+            if matches(state_diff.senate_diff, BillSnapshot.Chamber.SENATE)
+            else None,
+            assembly_diff=state_diff.assembly_diff
+            if matches(state_diff.assembly_diff, BillSnapshot.Chamber.ASSEMBLY)
+            else None,
+        )
+        if filtered_diff.senate_diff or filtered_diff.assembly_diff:
+            state_diffs.append(filtered_diff)
+
+    return BillDiffSet(
+        city_diffs=[
+            d
+            for d in bill_diffs.city_diffs
+            if matches(d, BillSnapshot.Chamber.CITY)
+        ],
+        state_diffs=state_diffs,
+    )
+
+
+def _get_diff_set_key(bill_diffs: BillDiffSet):
+    """Identifies which diffs are in a filtered set, so that users who get the
+    same set can share one rendered email."""
+    return tuple(
+        (d.bill_id, chamber)
+        for d, chamber in [
+            *((d, BillSnapshot.Chamber.CITY) for d in bill_diffs.city_diffs),
+            *(
+                (state_diff.senate_diff, BillSnapshot.Chamber.SENATE)
+                for state_diff in bill_diffs.state_diffs
+            ),
+            *(
+                (state_diff.assembly_diff, BillSnapshot.Chamber.ASSEMBLY)
+                for state_diff in bill_diffs.state_diffs
+            ),
+        ]
+        if d
+    )
+
+
+def _enqueue_bill_update_emails(
+    bill_diffs: BillDiffSet,
+    users: List[User],
+    *,
+    idempotency_prefix,
+    subject_prefix="",
 ):
-    bill_diffs = _calculate_all_bill_diffs(snapshots_by_bill_id)
+    """Queues an email for each user with the diffs they're subscribed to.
+    Each distinct set of diffs is only rendered once."""
+    users_by_diff_set_key = defaultdict(list)
+    diff_sets_by_key = {}
+    for user in users:
+        filtered_diffs = _filter_bill_diffs(
+            bill_diffs, user.notification_subscriptions
+        )
+        key = _get_diff_set_key(filtered_diffs)
+        if key:
+            users_by_diff_set_key[key].append(user)
+            diff_sets_by_key[key] = filtered_diffs
+
+    emails = []
+    for key, users_for_key in users_by_diff_set_key.items():
+        subject, body_html, body_text = _render_email_contents(
+            diff_sets_by_key[key]
+        )
+        emails.extend(
+            QueuedEmail(
+                idempotency_key=f"{idempotency_prefix}:{user.email}",
+                to_address=user.email,
+                subject=f"{subject_prefix}{subject}",
+                body_html=body_html,
+                body_text=body_text,
+            )
+            for user in users_for_key
+        )
+
+    logging.info(
+        f"Queueing {len(emails)} bill update emails with {len(users_by_diff_set_key)} distinct contents"
+    )
+    enqueue_emails(emails)
+
+
+def _get_users_to_notify(frequency: User.NotificationFrequency):
+    return (
+        User.query.filter_by(
+            send_bill_update_notifications=True,
+            notification_frequency=frequency,
+        )
+        .options(selectinload(User.notification_subscriptions))
+        .all()
+    )
+
+
+def _get_last_digest_time():
+    """The most recent time that the daily digest should have gone out"""
+    local_now = now().astimezone(NEW_YORK_TIMEZONE)
+    digest_time = local_now.replace(
+        hour=DAILY_DIGEST_HOUR, minute=0, second=0, microsecond=0
+    )
+    if digest_time > local_now:
+        digest_time -= timedelta(days=1)
+    return digest_time
+
+
+def _notify_users(
+    current_state: SnapshotState,
+    users: List[User],
+    *,
+    is_digest,
+):
+    previous_state, changed_state, change_id = _load_changed_snapshots(
+        current_state, is_digest=is_digest
+    )
+    bill_diffs = _calculate_all_bill_diffs(previous_state, current_state)
 
     if bill_diffs.city_diffs or bill_diffs.state_diffs:
-        logging.info("Bills were changed in this cron run, sending emails")
-
-        subject, body_html, body_text = _render_email_contents(bill_diffs)
-        users_to_notify = User.query.filter_by(
-            send_bill_update_notifications=True
-        ).all()
-
-        for user in users_to_notify:
-            logging.info(f"Sending bill update email to {user.email}")
-            try:
-                send_email(user.email, subject, body_html, body_text)
-            except ClientError:
-                logging.exception(f"Faild to send email to {user.email}")
+        logging.info(
+            f"Bills were changed since the last {'digest' if is_digest else 'cron run'}, queueing emails"
+        )
+        _enqueue_bill_update_emails(
+            bill_diffs,
+            users,
+            idempotency_prefix=f"bill-{'digest' if is_digest else 'update'}:{change_id}",
+            subject_prefix="Daily digest: " if is_digest else "",
+        )
+
+    _save_snapshots(changed_state, is_digest=is_digest)
+
+
+def send_bill_update_notifications():
+    """Queues emails to users about any bills that changed since the last time
+    this ran, and stores the bills' current state for next time, in the same
+    transaction. It can be called after any job that updates bills.
+
+    Users who get a daily digest are instead emailed once a day about the
+    changes since their last digest. Bills seen for the first time are only
+    stored, not reported."""
+    current_state = snapshot_bills()
+    _notify_users(
+        current_state,
+        _get_users_to_notify(User.NotificationFrequency.IMMEDIATE),
+        is_digest=False,
+    )
+
+    digest_users = _get_users_to_notify(
+        User.NotificationFrequency.DAILY_DIGEST
+    )
+    # The digest users share one set of snapshots, so it only goes out once
+    # every one of them is due. Users who switch to the digest start out as
+    # having just been sent one.
+    last_digest_time = _get_last_digest_time()
+    if digest_users and all(
+        not user.last_digest_sent_at
+        or user.last_digest_sent_at < last_digest_time
+        for user in digest_users
+    ):
+        _notify_users(current_state, digest_users, is_digest=True)
+        for user in digest_users:
+            user.last_digest_sent_at = now()
+
+    db.session.commit()
@@ -1,24 +1,63 @@
 from datetime import datetime, timezone
 
-import requests
-
 from src.settings import CITY_COUNCIL_API_TOKEN
 
 from .bill.models import Bill
+from .http_client import HttpClient
 from .utils import now
 
 # See http://webapi.legistar.com/Help for an overview of resources.
 
+# Shared by every call so that the cron reuses connections to the API rather
+# than doing a new TLS handshake for each bill and council member.
+council_client = HttpClient(
+    "https://webapi.legistar.com/v1/nyc/",
+    name="City Council API",
+    default_params={"token": CITY_COUNCIL_API_TOKEN},
+)
+
+
+# The API caps how many items it will return for a single request.
+COUNCIL_API_PAGE_SIZE = 1000
+
+# The API rejects very long URLs, so filters that list many ids get split up
+# into several requests that each stay well below the limit.
+MAX_FILTER_LENGTH = 1500
+
 
 def council_get(path, *, params=None):
-    if not params:
-        params = {}
-    response = requests.get(
-        f"https://webapi.legistar.com/v1/nyc/{path}",
-        params={"token": CITY_COUNCIL_API_TOKEN, **params},
-    )
-    response.raise_for_status()
-    return response.json()
+    return council_client.get(path, params=params)
+
+
+def council_get_all(path, *, params=None):
+    """Gets every item in a list resource, following the API's paging. The
+    params should include an $orderby so that the pages are stable."""
+    items = []
+    while True:
+        page = council_get(
+            path,
+            params={
+                **(params or {}),
+                "$top": COUNCIL_API_PAGE_SIZE,
+                "$skip": len(items),
+            },
+        )
+        items.extend(page)
+        if len(page) < COUNCIL_API_PAGE_SIZE:
+            return items
+
+
+def parse_council_datetime(value):
+    """Parses a timestamp from the API, such as 2021-10-12T15:32:11.47, into a
+    UTC datetime. The API varies the number of fractional digits, which
+    datetime.fromisoformat can't handle on its own."""
+    if not value:
+        return None
+    whole_seconds, _, fraction = value.partition(".")
+    result = datetime.fromisoformat(whole_seconds).replace(tzinfo=timezone.utc)
+    if fraction:
+        result = result.replace(microsecond=int(fraction[:6].ljust(6, "0")))
+    return result
 
 
 def date_filter(field, operator, date):
@@ -33,6 +72,22 @@ def make_filter_param(*filters):
     return {"$filter": " and ".join(filters)}
 
 
+def chunk_or_filters(filters, max_length=MAX_FILTER_LENGTH):
+    """Splits a list of filters into groups joined by "or", each of which is no
+    longer than max_length (unless a single filter is longer than that)."""
+    chunk = []
+    chunk_length = 0
+    for filter in filters:
+        if chunk and chunk_length + len(" or ") + len(filter) > max_length:
+            yield " or ".join(chunk)
+            chunk = []
+            chunk_length = 0
+        chunk_length += len(filter) + (len(" or ") if chunk else 0)
+        chunk.append(filter)
+    if chunk:
+        yield " or ".join(chunk)
+
+
 def _convert_matter_to_bill(matter):
     """Converts the City Council's representation of a bill, called Matters,
     into our own format."""
@@ -49,6 +104,9 @@ def _convert_matter_to_bill(matter):
             ).replace(tzinfo=timezone.utc),
             "status": matter["MatterStatusName"],
             "active_version": matter["MatterVersion"],
+            "last_modified_at": parse_council_datetime(
+                matter.get("MatterLastModifiedUtc")
+            ),
         },
     }
 
@@ -72,6 +130,39 @@ def lookup_bill(matter_id):
     return _convert_matter_to_bill(matter)
 
 
+def lookup_bills_by_ids(matter_ids):
+    """Looks up many bills with as few requests as possible, and returns them
+    keyed by their matter ID. IDs that the API doesn't have are left out."""
+    id_filters = [f"MatterId eq {int(id)}" for id in sorted(set(matter_ids))]
+    bills_by_id = {}
+    for filter in chunk_or_filters(id_filters):
+        for matter in council_get("matters", params={"$filter": filter}):
+            bills_by_id[matter["MatterId"]] = _convert_matter_to_bill(matter)
+    return bills_by_id
+
+
+def lookup_bills_modified_since(since):
+    """Looks up all bills that the Council has modified at or after the given
+    time. This is usually a short list, since most bills sit untouched for
+    long stretches."""
+    matters = council_get_all(
+        "matters",
+        params={
+            **make_filter_param(
+                eq_filter("MatterTypeName", "Introduction"),
+                # The API expects a naive timestamp, in UTC for this field.
+                date_filter(
+                    "MatterLastModifiedUtc",
+                    "ge",
+                    since.astimezone(timezone.utc).replace(tzinfo=None),
+                ),
+            ),
+            "$orderby": "MatterId",
+        },
+    )
+    return [_convert_matter_to_bill(m) for m in matters]
+
+
 def get_bill_sponsors(matter_id, active_version):
     sponsors = council_get(
         f"matters/{matter_id}/sponsors",
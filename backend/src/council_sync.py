@@ -1,20 +1,26 @@
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from requests import HTTPError
+from sqlalchemy.orm import joinedload
 
-from .bill.models import Bill
+from .bill.models import Bill, CityBill
 from .council_api import (
     get_bill_sponsors,
     get_current_council_members,
     get_person,
-    lookup_bill,
+    lookup_bills_by_ids,
+    lookup_bills_modified_since,
 )
 from .models import db
 from .person.models import CouncilMember, OfficeContact, Person
+from .person.sync import reconcile_office_contacts, upsert_legislators
+from .settings import (
+    CITY_COUNCIL_API_MAX_CONCURRENCY,
+    CITY_COUNCIL_API_MAX_REQUESTS_PER_SECOND,
+)
 from .sponsorship.models import CitySponsorship
 from .static_data.council_data import COUNCIL_DATA_BY_LEGISLATOR_ID
-from .utils import cron_function, now
+from .utils import cron_function, fetch_concurrently, now
 
 
 @cron_function
@@ -24,31 +30,31 @@ def add_council_members():
     to be filled in with other sources."""
     members = get_current_council_members()
 
+    values_by_person_id = {}
     for member in members:
-        city_council_person_id = member["OfficeRecordPersonId"]
-
-        existing_council_member = CouncilMember.query.filter_by(
-            city_council_person_id=city_council_person_id
-        ).one_or_none()
-        if existing_council_member:
-            council_member = existing_council_member
-            person = existing_council_member.person
-        else:
-            person = Person(type=Person.PersonType.COUNCIL_MEMBER)
-            person.council_member = CouncilMember()
-            council_member = person.council_member
-            db.session.add(person)
-
-        person.name = member["OfficeRecordFullName"]
-        # TODO: Figure out what exactly Title should be
-        person.title = "City Council Member"
-        council_member.city_council_person_id = city_council_person_id
-        council_member.term_start = datetime.fromisoformat(
-            member["OfficeRecordStartDate"]
-        ).replace(tzinfo=timezone.utc)
-        council_member.term_end = datetime.fromisoformat(
-            member["OfficeRecordEndDate"]
-        ).replace(tzinfo=timezone.utc)
+        city_council_person_id = int(member["OfficeRecordPersonId"])
+        values_by_person_id[city_council_person_id] = (
+            {
+                "name": member["OfficeRecordFullName"],
+                # TODO: Figure out what exactly Title should be
+                "title": "City Council Member",
+            },
+            {
+                "term_start": datetime.fromisoformat(
+                    member["OfficeRecordStartDate"]
+                ).replace(tzinfo=timezone.utc),
+                "term_end": datetime.fromisoformat(
+                    member["OfficeRecordEndDate"]
+                ).replace(tzinfo=timezone.utc),
+            },
+        )
+
+    upsert_legislators(
+        representative_model=CouncilMember,
+        key_column=CouncilMember.city_council_person_id,
+        person_type=Person.PersonType.COUNCIL_MEMBER,
+        values_by_key=values_by_person_id,
+    )
 
     db.session.commit()
 
@@ -58,37 +64,51 @@ def fill_council_person_data_from_api():
     """For all council members in the DB, updates their contact info and other details
     based on the Person API and our own static data.
     """
-    council_members = CouncilMember.query.all()
+    council_members = CouncilMember.query.options(
+        joinedload(CouncilMember.person).selectinload(Person.office_contacts)
+    ).all()
+
+    # Download everyone's data in parallel first, since the time here is
+    # mostly spent waiting on the API. Then write it all on this thread, which
+    # owns the DB session.
+    data_by_person_id, errors_by_person_id = fetch_concurrently(
+        get_person,
+        [c.city_council_person_id for c in council_members],
+        max_workers=CITY_COUNCIL_API_MAX_CONCURRENCY,
+        max_per_second=CITY_COUNCIL_API_MAX_REQUESTS_PER_SECOND,
+    )
+    for person_id, error in errors_by_person_id.items():
+        logging.error(
+            f"Could not get Person {person_id} from API", exc_info=error
+        )
 
     for council_member in council_members:
-        try:
-            data = get_person(council_member.city_council_person_id)
-            council_member.person.email = data["PersonEmail"]
-            council_member.website = data["PersonWWW"]
-
-            council_member.person.office_contacts.clear()
-            if legislative_phone := data.get("PersonPhone"):
-                council_member.person.office_contacts.append(
-                    OfficeContact(
-                        phone=legislative_phone.strip(),
-                        type=OfficeContact.OfficeContactType.CENTRAL_OFFICE,
-                    )
+        data = data_by_person_id.get(council_member.city_council_person_id)
+        if data is None:
+            continue
+
+        council_member.person.email = data["PersonEmail"]
+        council_member.website = data["PersonWWW"]
+
+        office_contacts = []
+        if legislative_phone := data.get("PersonPhone"):
+            office_contacts.append(
+                OfficeContact(
+                    phone=legislative_phone.strip(),
+                    type=OfficeContact.OfficeContactType.CENTRAL_OFFICE,
                 )
-            if district_phone := data.get("PersonPhone2"):
-                council_member.person.office_contacts.append(
-                    OfficeContact(
-                        phone=district_phone.strip(),
-                        type=OfficeContact.OfficeContactType.DISTRICT_OFFICE,
-                    )
+            )
+        if district_phone := data.get("PersonPhone2"):
+            office_contacts.append(
+                OfficeContact(
+                    phone=district_phone.strip(),
+                    type=OfficeContact.OfficeContactType.DISTRICT_OFFICE,
                 )
-
-            # Borough exists here but we prefer the cleaned static data
-            # council_member.borough = data["PersonCity1"]
-        except HTTPError:
-            logging.exception(
-                f"Could not get Person {council_member.city_council_person_id} from API"
             )
-            continue
+        reconcile_office_contacts(council_member.person, office_contacts)
+
+        # Borough exists here but we prefer the cleaned static data
+        # council_member.borough = data["PersonCity1"]
 
     db.session.commit()
 
@@ -133,8 +153,13 @@ def fill_council_person_static_data():
 # Bills ----------------------------------------------------------------------
 
 
-def _update_bill(bill):
-    bill_data = lookup_bill(bill.city_bill.city_bill_id)
+# Matters modified within this long before a bill's last sync are fetched again,
+# in case the API's clock is a little behind ours. Re-fetching an unchanged
+# matter is harmless since it's skipped by its last modified time.
+SYNC_OVERLAP = timedelta(minutes=15)
+
+
+def _update_bill(bill, bill_data):
     logging.info(
         f"Updating bill {bill.city_bill.city_bill_id} and got {bill_data}"
     )
@@ -145,13 +170,109 @@ def _update_bill(bill):
         setattr(bill.city_bill, key, bill_data["city_bill"][key])
 
 
-def sync_bill_updates():
+def _refresh_bill(bill, bill_data, synced_at):
+    """Updates a bill's details and sponsors, and commits them. Failures are
+    rolled back without affecting other bills, and leave the bill's sync time
+    unchanged so that it gets picked up again next time."""
+    city_bill_id = bill.city_bill.city_bill_id
+    try:
+        _update_bill(bill, bill_data)
+        update_bill_sponsorships(bill.city_bill, set_added_at=True)
+        bill.city_bill.synced_at = synced_at
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logging.exception(f"Exception while syncing bill {city_bill_id}")
+
+
+@cron_function
+def sync_bill_updates(full_resync=False):
+    """Refreshes the details and sponsorships of all tracked city bills.
+
+    Normally this is incremental. Each bill keeps the MatterLastModifiedUtc of
+    the version we last pulled, and we make one query for the matters modified
+    since the last sync. Only the bills the API reports as newer get
+    refetched. Bills without those timestamps, bills that failed to sync last
+    time, or every bill when full_resync is set, are looked up in batches by
+    their IDs instead.
+    """
+    synced_at = now()
     bills = Bill.query.filter_by(type=Bill.BillType.CITY).all()
 
+    # Every bill that synced in the last run has that run's sync time. One
+    # that failed to refresh keeps an older one, and is looked up by its ID
+    # rather than holding the modified-since window open for the others.
+    last_synced_at = max(
+        (
+            b.city_bill.synced_at
+            for b in bills
+            if b.city_bill.last_modified_at and b.city_bill.synced_at
+        ),
+        default=None,
+    )
+
+    bills_to_lookup = []
+    marked_bills = []
     for bill in bills:
-        _update_bill(bill)
+        if (
+            full_resync
+            or bill.city_bill.last_modified_at is None
+            or bill.city_bill.synced_at is None
+            or bill.city_bill.synced_at < last_synced_at
+        ):
+            bills_to_lookup.append(bill)
+        else:
+            marked_bills.append(bill)
+
+    # Pairs of bills and their new data from the API
+    bills_to_refresh = []
+    if bills_to_lookup:
+        looked_up_bills_by_id = lookup_bills_by_ids(
+            [b.city_bill.city_bill_id for b in bills_to_lookup]
+        )
+        for bill in bills_to_lookup:
+            bill_data = looked_up_bills_by_id.get(bill.city_bill.city_bill_id)
+            if bill_data:
+                bills_to_refresh.append((bill, bill_data))
+            else:
+                logging.warning(
+                    f"Council API did not return bill {bill.city_bill.city_bill_id}"
+                )
+
+    unchanged_bill_ids = []
+    if marked_bills:
+        since = last_synced_at - SYNC_OVERLAP
+        modified_bills_by_id = {
+            b["city_bill"]["city_bill_id"]: b
+            for b in lookup_bills_modified_since(since)
+        }
+        logging.info(
+            f"Council API reported {len(modified_bills_by_id)} bills modified since {since}"
+        )
+
+        for bill in marked_bills:
+            bill_data = modified_bills_by_id.get(bill.city_bill.city_bill_id)
+            if (
+                bill_data
+                and bill_data["city_bill"]["last_modified_at"]
+                > bill.city_bill.last_modified_at
+            ):
+                bills_to_refresh.append((bill, bill_data))
+            else:
+                unchanged_bill_ids.append(bill.id)
+
+    logging.info(
+        f"Refreshing {len(bills_to_refresh)} of {len(bills)} city bills"
+    )
+    if unchanged_bill_ids:
+        CityBill.query.filter(CityBill.bill_id.in_(unchanged_bill_ids)).update(
+            {CityBill.synced_at: synced_at}, synchronize_session=False
+        )
         db.session.commit()
 
+    for bill, bill_data in bills_to_refresh:
+        _refresh_bill(bill, bill_data, synced_at)
+
 
 def update_bill_sponsorships(city_bill, set_added_at=False):
     """
@@ -3,12 +3,14 @@ from time import sleep
 
 from . import (
     bill_notifications,
+    council_api,
     council_sync,
     models,
     state_api,
     state_static_sync,
 )
 from .app import app
+from .power_hour_jobs import runner as power_hour_jobs
 from .settings import ENABLE_CRON
 from .static_data import assembly_data, senate_data
 
@@ -20,6 +22,10 @@ def cron_command():
         if ENABLE_CRON:
             try:
                 logging.info("Syncing data...")
+                council_api.council_client.reset_stats()
+                state_api.senate_client.reset_stats()
+                state_api.senate_client.cache.reset_stats()
+
                 logging.info("Adding city council members")
                 council_sync.add_council_members()
 
@@ -33,17 +39,12 @@ def cron_command():
                 logging.info("Syncing state reps")
                 state_api.sync_state_representatives()
 
-                bill_snapshots = bill_notifications.snapshot_bills()
-
                 logging.info("Syncing state bill updates")
                 state_api.update_state_bills()
 
-                logging.info("Syncing all city bill updates")
+                logging.info("Syncing city bill updates and sponsorships")
                 council_sync.sync_bill_updates()
 
-                logging.info("Syncing all city bill sponsorships")
-                council_sync.update_all_sponsorships()
-
                 state_static_sync.fill_static_state_data(
                     senate_data_by_member_id=senate_data.SCRAPED_SENATE_DATA_BY_MEMBER_ID,
                     assembly_data_by_member_id=assembly_data.SCRAPED_ASSEMBLY_DATA_BY_MEMBER_ID,
@@ -52,10 +53,18 @@ def cron_command():
                 logging.info(
                     "Checking if bills have changed, and sending notifications if so"
                 )
-                bill_notifications.send_bill_update_notifications(
-                    bill_snapshots
-                )
+                bill_notifications.send_bill_update_notifications()
+
+                logging.info("Running any power hour jobs left waiting")
+                power_hour_jobs.run_pending_power_hour_jobs()
 
+                logging.info(
+                    f"City Council API usage: {council_api.council_client.reset_stats()}"
+                )
+                logging.info(
+                    f"Senate API usage: {state_api.senate_client.reset_stats()}, "
+                    f"{state_api.senate_client.cache.reset_stats()}"
+                )
                 logging.info("Cron run complete")
             except Exception as e:
                 logging.exception(e)
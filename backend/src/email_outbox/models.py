@@ -0,0 +1,49 @@
+import enum
+from uuid import uuid4
+
+from sqlalchemy import Column, Enum, Integer, Text
+
+from ..models import TIMESTAMP, UUID, db
+from ..utils import now
+
+
+class OutboundEmail(db.Model):
+    """
+    An email for the email worker to send. Anything that sends email adds a
+    row here rather than calling SES itself, so sending never slows down a
+    request, and emails that fail are retried even across restarts."""
+
+    __tablename__ = "outbound_emails"
+
+    class Status(enum.Enum):
+        PENDING = 1
+        SENT = 2
+        # We gave up after too many failed attempts
+        FAILED = 3
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+
+    # Queueing an email whose key is already in the outbox does nothing, so
+    # that retrying whatever queued it doesn't send it twice.
+    idempotency_key = Column(Text, nullable=False, unique=True)
+
+    to_address = Column(Text, nullable=False)
+    subject = Column(Text, nullable=False)
+    body_html = Column(Text, nullable=False)
+    body_text = Column(Text, nullable=False)
+
+    status = Column(
+        Enum(Status, name="outboundemailstatus"),
+        nullable=False,
+        default=Status.PENDING,
+        index=True,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP, nullable=False, default=now)
+    last_error = Column(Text)
+
+    # Assigned by SES once it accepts the email
+    message_id = Column(Text)
+
+    created_at = Column(TIMESTAMP, nullable=False, default=now)
+    sent_at = Column(TIMESTAMP)
@@ -0,0 +1,165 @@
+"""Queues outgoing email in the database. The emails are sent by a separate
+worker process, started with `flask email-worker`."""
+
+import logging
+import random
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from time import sleep
+from typing import List
+from uuid import uuid4
+
+from sqlalchemy.dialects.postgresql import insert
+
+from ..app import app
+from ..models import db
+from ..ses import DeliveryReport, is_throttling_error, send_email
+from ..settings import SES_MAX_CONCURRENCY, SES_MAX_SEND_RATE
+from ..utils import fetch_concurrently, now
+from .models import OutboundEmail
+
+BATCH_SIZE = 100
+
+# With these, an email is retried for about half a day before we give up
+MAX_ATTEMPTS = 15
+BASE_RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=2)
+
+POLL_INTERVAL_SECONDS = 5
+
+
+@dataclass
+class QueuedEmail:
+    idempotency_key: str
+    to_address: str
+    subject: str
+    body_html: str
+    body_text: str
+
+
+def enqueue_emails(emails: List[QueuedEmail]):
+    """Adds emails to the outbox, skipping any whose idempotency key is
+    already there. Doesn't commit, so the emails are only queued if whatever
+    they're about gets saved too."""
+    if not emails:
+        return
+
+    rows = [
+        {
+            **asdict(email),
+            "id": uuid4(),
+            "status": OutboundEmail.Status.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now(),
+            "created_at": now(),
+        }
+        for email in emails
+    ]
+    db.session.execute(
+        insert(OutboundEmail)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[OutboundEmail.idempotency_key])
+    )
+
+
+def enqueue_email(email: QueuedEmail):
+    enqueue_emails([email])
+
+
+def _get_retry_delay(attempts):
+    delay = min(BASE_RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+    # Jitter, so that a batch that was throttled doesn't all retry at once
+    return delay * random.uniform(0.5, 1)
+
+
+def _record_failure(email: OutboundEmail, error, report: DeliveryReport):
+    email.last_error = str(error)
+    if is_throttling_error(error):
+        # SES didn't try to deliver it, so it doesn't count as an attempt
+        report.throttled += 1
+        email.next_attempt_at = now() + _get_retry_delay(1)
+        logging.warning(
+            f"Sending email {email.idempotency_key} to {email.to_address} was throttled, will retry"
+        )
+        return
+
+    email.attempts += 1
+    report.failed += 1
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+        logging.error(
+            f"Giving up on email {email.idempotency_key} to {email.to_address} after {email.attempts} attempts: {error}"
+        )
+    else:
+        email.next_attempt_at = now() + _get_retry_delay(email.attempts)
+        logging.warning(
+            f"Failed to send email {email.idempotency_key} to {email.to_address}, will retry: {error}"
+        )
+
+
+def drain_outbox(*, ses_client=None, batch_size=BATCH_SIZE) -> DeliveryReport:
+    """Sends every queued email that's due, and schedules a retry with
+    exponential backoff for each one that fails.
+
+    Each batch stays locked while it's sent, so several workers can drain the
+    outbox at once without sending anything twice."""
+    report = DeliveryReport()
+    while True:
+        batch = (
+            OutboundEmail.query.filter(
+                OutboundEmail.status == OutboundEmail.Status.PENDING,
+                OutboundEmail.next_attempt_at <= now(),
+            )
+            .order_by(OutboundEmail.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not batch:
+            return report
+
+        # The sending threads can't touch the DB session, so give them plain
+        # values to work with
+        messages_by_id = {
+            email.id: (
+                email.to_address,
+                email.subject,
+                email.body_html,
+                email.body_text,
+            )
+            for email in batch
+        }
+        message_ids, errors = fetch_concurrently(
+            lambda id: send_email(*messages_by_id[id], ses_client=ses_client),
+            list(messages_by_id.keys()),
+            max_workers=SES_MAX_CONCURRENCY,
+            max_per_second=SES_MAX_SEND_RATE,
+        )
+
+        for email in batch:
+            if email.id in errors:
+                _record_failure(email, errors[email.id], report)
+                continue
+
+            email.attempts += 1
+            email.status = OutboundEmail.Status.SENT
+            email.message_id = message_ids[email.id]
+            email.sent_at = now()
+            report.sent += 1
+
+        db.session.commit()
+
+
+@app.cli.command("email-worker")
+def email_worker_command():
+    logging.info("Email worker starting")
+    while True:
+        try:
+            report = drain_outbox()
+            if report.sent or report.failed or report.throttled:
+                logging.info(f"Email worker: {report}")
+        except Exception:
+            logging.exception("Unhandled exception in email worker")
+            db.session.rollback()
+
+        sleep(POLL_INTERVAL_SECONDS)
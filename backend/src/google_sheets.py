@@ -2,18 +2,29 @@ from __future__ import print_function
 
 import json
 import logging
+import threading
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Load, selectinload
 
 from . import settings, twitter
-from .bill.models import CityBill
+from .bill.models import AssemblyBill, Bill, CityBill, SenateBill
 from .models import UUID
-from .person.models import CouncilMember, OfficeContact, Person
-from .sponsorship.models import CitySponsorship
+from .person.models import (
+    AssemblyMember,
+    CouncilMember,
+    OfficeContact,
+    Person,
+    Senator,
+)
+from .sponsorship.models import (
+    AssemblySponsorship,
+    CitySponsorship,
+    SenateSponsorship,
+)
 
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
@@ -32,7 +43,11 @@ COLUMN_TITLES = [
     "Twitter search\nNote: Due to a Twitter bug, the Twitter search sometimes displays 0 results even when there should be should be matching tweets. Refreshing the Twitter page often fixes this.",
     "Staffers",
 ]
-COLUMN_TITLE_SET = set(COLUMN_TITLES)
+# State legislators are listed by district rather than borough
+STATE_COLUMN_TITLES = [
+    "District" if title == "Borough" else title for title in COLUMN_TITLES
+]
+COLUMN_TITLE_SET = set(COLUMN_TITLES) | set(STATE_COLUMN_TITLES)
 
 BOROUGH_SORT_TABLE = {
     "Brooklyn": 0,
@@ -60,6 +75,13 @@ COLUMN_WIDTHS = [
 ]
 
 
+# Only the displayed values are needed from a previous power hour, so skip
+# everything else, like each cell's formatting
+PREVIOUS_POWER_HOUR_FIELDS = (
+    "sheets(properties(title),data(rowData(values(formattedValue))))"
+)
+
+
 # TODO: Make this a dataclass
 class Cell:
     value = None  # str
@@ -81,34 +103,98 @@ class PowerHourImportData:
     import_messages: List[str]
 
 
+Legislator = Union[CouncilMember, Senator, AssemblyMember]
+
+
+@dataclass
+class PowerHourTab:
+    """The legislators of one chamber, who each get a row in that chamber's
+    tab of a power hour spreadsheet. City power hours have a single untitled
+    tab, and state power hours have a Senate and an Assembly tab."""
+
+    title: Optional[str]
+    column_titles: List[str]
+
+    # Pairs of the legislator and whether they're the lead sponsor
+    sponsors: List[Tuple[Legislator, bool]]
+    non_sponsors: List[Legislator]
+
+    import_data: Optional[PowerHourImportData] = None
+
+    @property
+    def legislators(self):
+        return self.non_sponsors + [s for s, _ in self.sponsors]
+
+
+_credentials_lock = threading.Lock()
+_credentials = None
+
+# Service objects share an httplib2 connection, which isn't thread safe, so
+# each thread builds its own. Each thread's services are rebuilt once the
+# generation moves past the one they were built in.
+_thread_local = threading.local()
+_services_generation = 0
+
+
 def _get_google_credentials():
-    return Credentials.from_service_account_info(
-        json.loads(settings.GOOGLE_CREDENTIALS)
-    )
+    """Parses the service account credentials once per process. The services
+    using them fetch a new access token whenever the old one expires."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = Credentials.from_service_account_info(
+                json.loads(settings.GOOGLE_CREDENTIALS)
+            )
+        return _credentials
+
+
+def _get_service(name, version):
+    services = getattr(_thread_local, "services", None)
+    if services is None or _thread_local.generation != _services_generation:
+        services = _thread_local.services = {}
+        _thread_local.generation = _services_generation
+
+    if (name, version) not in services:
+        # The discovery documents that ship with the client library are
+        # enough for us, so don't fetch them over the network
+        services[(name, version)] = build(
+            name,
+            version,
+            credentials=_get_google_credentials(),
+            static_discovery=True,
+            cache_discovery=False,
+        )
+    return services[(name, version)]
+
 
+def _get_sheets_service():
+    return _get_service("sheets", "v4")
 
-def _get_sheets_service(credentials):
-    return build("sheets", "v4", credentials=credentials)
 
+def _get_drive_service():
+    return _get_service("drive", "v3")
 
-def _get_drive_service(credentials):
-    return build("drive", "v3", credentials=credentials)
+
+def clear_google_services():
+    """Forgets the cached credentials and every thread's services, e.g. after
+    the credentials setting changes. Other threads rebuild their services the
+    next time they use them."""
+    global _credentials, _services_generation
+    with _credentials_lock:
+        _credentials = None
+        _services_generation += 1
 
 
 def _create_cell_data(cell):
-    text_format_runs = None
+    """Only has the cell's value, and its link if it has one. Formatting is
+    applied to whole ranges afterwards, see _create_sheet_format_requests."""
+    cell_data = {"userEnteredValue": {"stringValue": str(cell.value)}}
     if cell.link_url:
-        text_format_runs = [
+        # Links aren't uniform, so they can't be applied to a range
+        cell_data["textFormatRuns"] = [
             {"startIndex": 0, "format": {"link": {"uri": cell.link_url}}}
         ]
-    return {
-        "textFormatRuns": text_format_runs,
-        "userEnteredValue": {"stringValue": str(cell.value)},
-        "userEnteredFormat": {
-            "wrapStrategy": "WRAP",
-            "textFormat": {"bold": cell.bold},
-        },
-    }
+    return cell_data
 
 
 def _create_row_data(cells):
@@ -128,26 +214,30 @@ def _get_staffer_display_string(staffer: Person):
     return f"{title_string}{staffer.name} ({contact_string})"
 
 
+def _get_legislator_region(legislator: Legislator):
+    if isinstance(legislator, CouncilMember):
+        return legislator.borough
+    return legislator.district or ""
+
+
 def _create_legislator_row(
-    council_member: CouncilMember,
-    city_bill: CityBill,
+    legislator: Legislator,
+    bill: Bill,
     import_data: Optional[PowerHourImportData],
     is_lead_sponsor: bool = False,
 ):
+    person = legislator.person
     staffer_strings = [
-        _get_staffer_display_string(s)
-        for s in council_member.person.staffer_persons
+        _get_staffer_display_string(s) for s in person.staffer_persons
     ]
     staffer_text = "\n\n".join(staffer_strings)
 
-    twitter_search_url = twitter.get_bill_twitter_search_url(
-        city_bill.bill, council_member.person
-    )
+    twitter_search_url = twitter.get_bill_twitter_search_url(bill, person)
 
     legislative_phone = ", ".join(
         (
             c.phone
-            for c in council_member.person.office_contacts
+            for c in person.office_contacts
             if c.phone
             and c.type == OfficeContact.OfficeContactType.CENTRAL_OFFICE
         )
@@ -155,24 +245,22 @@ def _create_legislator_row(
     district_phone = ", ".join(
         (
             c.phone
-            for c in council_member.person.office_contacts
+            for c in person.office_contacts
             if c.phone
             and c.type == OfficeContact.OfficeContactType.DISTRICT_OFFICE
         )
     )
     cells = [
         Cell(""),
-        Cell(
-            _get_sponsor_name_text(council_member.person.name, is_lead_sponsor)
-        ),
-        Cell(council_member.person.email),
-        Cell(council_member.person.party),
-        Cell(council_member.borough),
+        Cell(_get_sponsor_name_text(person.name, is_lead_sponsor)),
+        Cell(person.email),
+        Cell(person.party),
+        Cell(_get_legislator_region(legislator)),
         Cell(district_phone),
         Cell(legislative_phone),
         Cell(
-            council_member.person.display_twitter or "",
-            link_url=council_member.person.twitter_url,
+            person.display_twitter or "",
+            link_url=person.twitter_url,
         ),
         Cell(
             "Relevant tweets" if twitter_search_url else "",
@@ -182,7 +270,7 @@ def _create_legislator_row(
     ]
     if import_data:
         legislator_data = import_data.column_data_by_legislator_id.get(
-            council_member.person_id
+            legislator.person_id
         )
         if legislator_data is not None:
             for extra_column in import_data.extra_column_titles:
@@ -190,61 +278,123 @@ def _create_legislator_row(
                 cells.append(Cell(text))
         else:
             logging.warning(
-                f"No legislator data for {council_member.person.name} in import data"
+                f"No legislator data for {person.name} in import data"
             )
-    return _create_row_data(cells)
+    return cells
 
 
-def _create_title_row_data(raw_values):
-    cells = [Cell(value, bold=True) for value in raw_values]
-    return _create_row_data(cells)
+def _create_title_row(raw_values):
+    return [Cell(value, bold=True) for value in raw_values]
 
 
-def _create_phone_bank_spreadsheet_data(
-    city_bill: CityBill,
-    sheet_title: str,
-    sponsorships: List[CitySponsorship],
-    non_sponsors: List[CitySponsorship],
-    import_data: Optional[PowerHourImportData],
-):
-    """Generates the full body payload that the Sheets API requires for a
-    phone bank spreadsheet."""
-
+def _create_sheet_rows(bill: Bill, tab: PowerHourTab) -> List[List[Cell]]:
+    import_data = tab.import_data
     extra_titles = import_data.extra_column_titles if import_data else []
     rows = [
-        _create_title_row_data(
-            COLUMN_TITLES + extra_titles,
+        _create_title_row(
+            tab.column_titles + extra_titles,
         ),
-        _create_title_row_data(["NON-SPONSORS"]),
+        _create_title_row(["NON-SPONSORS"]),
     ]
-    for non_sponsor in non_sponsors:
-        rows.append(
-            _create_legislator_row(non_sponsor, city_bill, import_data)
-        )
+    for non_sponsor in tab.non_sponsors:
+        rows.append(_create_legislator_row(non_sponsor, bill, import_data))
 
-    rows.append(_create_title_row_data([]))
-    rows.append(_create_title_row_data(["SPONSORS"]))
+    rows.append(_create_title_row([]))
+    rows.append(_create_title_row(["SPONSORS"]))
 
-    for sponsorship in sponsorships:
+    for sponsor, is_lead_sponsor in tab.sponsors:
         rows.append(
             _create_legislator_row(
-                sponsorship.council_member,
-                city_bill,
+                sponsor,
+                bill,
                 import_data,
-                sponsorship.sponsor_sequence == 0,
+                is_lead_sponsor,
             )
         )
+    return rows
+
+
+def _create_sheet_format_requests(sheet_id, rows: List[List[Cell]]):
+    """Generates batchUpdate requests that format a whole sheet a range at a
+    time, so their size depends on the number of columns and title rows
+    rather than the number of cells."""
+    requests = [
+        {
+            "repeatCell": {
+                "range": {"sheetId": sheet_id},
+                "cell": {"userEnteredFormat": {"wrapStrategy": "WRAP"}},
+                "fields": "userEnteredFormat.wrapStrategy",
+            }
+        }
+    ]
+    for row_index, cells in enumerate(rows):
+        if cells and all(cell.bold for cell in cells):
+            requests.append(
+                {
+                    "repeatCell": {
+                        "range": {
+                            "sheetId": sheet_id,
+                            "startRowIndex": row_index,
+                            "endRowIndex": row_index + 1,
+                        },
+                        "cell": {
+                            "userEnteredFormat": {"textFormat": {"bold": True}}
+                        },
+                        "fields": "userEnteredFormat.textFormat.bold",
+                    }
+                }
+            )
+    for column_index, width in enumerate(COLUMN_WIDTHS):
+        requests.append(
+            {
+                "updateDimensionProperties": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "dimension": "COLUMNS",
+                        "startIndex": column_index,
+                        "endIndex": column_index + 1,
+                    },
+                    "properties": {"pixelSize": width},
+                    "fields": "pixelSize",
+                }
+            }
+        )
+    return requests
 
-    column_metadata = [{"pixelSize": size} for size in COLUMN_WIDTHS]
-    return {
-        "properties": {"title": sheet_title},
-        "sheets": [
+
+def _create_phone_bank_spreadsheet_data(
+    bill: Bill,
+    sheet_title: str,
+    tabs: List[PowerHourTab],
+) -> Tuple[Dict, List[Dict]]:
+    """Generates the full body payload that the Sheets API requires for a
+    phone bank spreadsheet, with all of its tabs and just their values. Also
+    returns the batchUpdate requests that format it once it's created."""
+    sheets = []
+    format_requests = []
+    for sheet_id, tab in enumerate(tabs):
+        rows = _create_sheet_rows(bill, tab)
+
+        properties = {
+            "sheetId": sheet_id,
+            "gridProperties": {"frozenRowCount": 1},
+        }
+        if tab.title:
+            properties["title"] = tab.title
+
+        sheets.append(
             {
-                "properties": {"gridProperties": {"frozenRowCount": 1}},
-                "data": {"rowData": rows, "columnMetadata": column_metadata},
+                "properties": properties,
+                "data": {"rowData": [_create_row_data(row) for row in rows]},
             }
-        ],
+        )
+        format_requests.extend(_create_sheet_format_requests(sheet_id, rows))
+
+    spreadsheet_data = {
+        "properties": {"title": sheet_title},
+        "sheets": sheets,
     }
+    return spreadsheet_data, format_requests
 
 
 def get_sort_key(council_member):
@@ -254,24 +404,40 @@ def get_sort_key(council_member):
     return (sort_key, council_member.person.name)
 
 
+def get_district_sort_key(representative):
+    return (
+        representative.district is None,
+        representative.district or 0,
+        representative.person.name,
+    )
+
+
 def _get_sponsor_name_text(legislator_name, is_lead):
     return f"{legislator_name}{' (lead)' if is_lead else ''}"
 
 
-def create_power_hour(
-    bill_id: UUID, title: str, old_spreadsheet_to_import: str
-) -> Tuple[Dict, List[str]]:
-    """Creates a spreadsheet that's a template to run a phone bank
-    for a specific bill, based on its current sponsors. The sheet will be
-    owned by a robot Google account and will be made publicly editable by
-    anyone with the link."""
-    logging.info(
-        f"Creating new power hour titled {title}, importing old spreadsheet {old_spreadsheet_to_import}"
-    )
+def _get_legislator_row_load_options(legislator_load, legislator_class):
+    """Eagerly loads everything that _create_legislator_row reads from a
+    legislator, so building the rows doesn't query per legislator."""
+    person_load = legislator_load.joinedload(legislator_class.person)
+    return [
+        person_load.selectinload(Person.office_contacts),
+        person_load.selectinload(Person.staffer_persons).selectinload(
+            Person.office_contacts
+        ),
+    ]
+
+
+def _get_city_tab(bill_id: UUID) -> PowerHourTab:
     city_bill = (
         CityBill.query.filter_by(bill_id=bill_id)
         .options(
-            selectinload(CityBill.sponsorships),
+            *_get_legislator_row_load_options(
+                selectinload(CityBill.sponsorships).joinedload(
+                    CitySponsorship.council_member
+                ),
+                CouncilMember,
+            )
         )
         .one()
     )
@@ -282,31 +448,132 @@ def create_power_hour(
     )
 
     sponsor_ids = [s.council_member_id for s in sponsorships]
-    non_sponsors = CouncilMember.query.filter(
-        CouncilMember.person_id.not_in(sponsor_ids)
-    ).all()
+    non_sponsors = (
+        CouncilMember.query.filter(CouncilMember.person_id.not_in(sponsor_ids))
+        .options(
+            *_get_legislator_row_load_options(
+                Load(CouncilMember), CouncilMember
+            )
+        )
+        .all()
+    )
     non_sponsors = sorted(non_sponsors, key=get_sort_key)
 
+    return PowerHourTab(
+        title=None,
+        column_titles=COLUMN_TITLES,
+        sponsors=[
+            (s.council_member, s.sponsor_sequence == 0) for s in sponsorships
+        ],
+        non_sponsors=non_sponsors,
+    )
+
+
+def _get_state_chamber_tab(
+    bill_id: UUID,
+    title: str,
+    chamber_bill_model,
+    sponsorship_model,
+    representative_model,
+) -> Optional[PowerHourTab]:
+    """Builds the tab for one chamber of a state bill, or returns None if the
+    bill doesn't have a version in that chamber."""
+    chamber_bill = (
+        chamber_bill_model.query.filter_by(bill_id=bill_id)
+        .options(
+            *_get_legislator_row_load_options(
+                selectinload(chamber_bill_model.sponsorships).joinedload(
+                    sponsorship_model.representative
+                ),
+                representative_model,
+            )
+        )
+        .one_or_none()
+    )
+    if not chamber_bill:
+        return None
+
+    sponsorships = sorted(
+        chamber_bill.sponsorships,
+        key=lambda s: get_district_sort_key(s.representative),
+    )
+
+    sponsor_ids = [s.person_id for s in sponsorships]
+    non_sponsors = (
+        representative_model.query.filter(
+            representative_model.person_id.not_in(sponsor_ids)
+        )
+        .options(
+            *_get_legislator_row_load_options(
+                Load(representative_model), representative_model
+            )
+        )
+        .all()
+    )
+    non_sponsors = sorted(non_sponsors, key=get_district_sort_key)
+
+    return PowerHourTab(
+        title=title,
+        column_titles=STATE_COLUMN_TITLES,
+        sponsors=[(s.representative, s.is_lead_sponsor) for s in sponsorships],
+        non_sponsors=non_sponsors,
+    )
+
+
+def _get_power_hour_tabs(bill: Bill) -> List[PowerHourTab]:
+    if bill.type == Bill.BillType.CITY:
+        return [_get_city_tab(bill.id)]
+
+    tabs = [
+        _get_state_chamber_tab(
+            bill.id, "Senate", SenateBill, SenateSponsorship, Senator
+        ),
+        _get_state_chamber_tab(
+            bill.id,
+            "Assembly",
+            AssemblyBill,
+            AssemblySponsorship,
+            AssemblyMember,
+        ),
+    ]
+    return [tab for tab in tabs if tab]
+
+
+def create_power_hour(
+    bill_id: UUID, title: str, old_spreadsheet_to_import: str
+) -> Tuple[Dict, List[str]]:
+    """Creates a spreadsheet that's a template to run a phone bank
+    for a specific bill, based on its current sponsors. State bills get a tab
+    for each chamber. The sheet will be owned by a robot Google account and
+    will be made publicly editable by anyone with the link."""
+    logging.info(
+        f"Creating new power hour titled {title}, importing old spreadsheet {old_spreadsheet_to_import}"
+    )
+    bill = Bill.query.get(bill_id)
+    tabs = _get_power_hour_tabs(bill)
+
+    output_messages = []
     if old_spreadsheet_to_import:
-        import_data = _extract_data_from_previous_power_hour(
-            old_spreadsheet_to_import
+        output_messages = _import_previous_power_hour(
+            old_spreadsheet_to_import, tabs
         )
-    else:
-        import_data = None
 
-    spreadsheet_data = _create_phone_bank_spreadsheet_data(
-        city_bill, title, sponsorships, non_sponsors, import_data
+    spreadsheet_data, format_requests = _create_phone_bank_spreadsheet_data(
+        bill, title, tabs
     )
 
-    google_credentials = _get_google_credentials()
-    sheets_service = _get_sheets_service(google_credentials)
+    sheets_service = _get_sheets_service()
 
     spreadsheet_result = (
         sheets_service.spreadsheets().create(body=spreadsheet_data).execute()
     )
+    sheets_service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_result["spreadsheetId"],
+        body={"requests": format_requests},
+    ).execute()
 
     # That sheet is initially only accessible to our robot account, so make it public.
-    drive_service = _get_drive_service(google_credentials)
+    drive_service = _get_drive_service()
     user_permission = {
         "type": "anyone",
         "role": "writer",
@@ -317,16 +584,16 @@ def create_power_hour(
         fields="id",
     ).execute()
 
-    output_messages = import_data.import_messages if import_data else []
     output_messages.append("Spreadsheet was created")
 
     return (spreadsheet_result, output_messages)
 
 
-def _get_raw_cell_data(spreadsheet):
-    """Takes in a deeply nested Google Spreadsheet object and simplifies it into a
-    2D array of cell data strings."""
-    row_data = spreadsheet["sheets"][0]["data"][0]["rowData"]
+def _get_raw_cell_data(sheet):
+    """Takes in a deeply nested Google Spreadsheet sheet object and simplifies it
+    into a 2D array of cell data strings. Empty sheets and rows are left out of
+    the response entirely."""
+    row_data = sheet["data"][0].get("rowData", [])
 
     def get_data(cell):
         if "formattedValue" in cell:
@@ -342,12 +609,12 @@ def _get_raw_cell_data(spreadsheet):
 
 
 def _extract_data_from_previous_spreadsheet(
-    spreadsheet_cells,
+    spreadsheet_cells, legislators: List[Legislator]
 ) -> PowerHourImportData:
     import_messages = []
 
     if not spreadsheet_cells:
-        return PowerHourImportData(None, None, ["Old spreadsheet was empty"])
+        return PowerHourImportData([], {}, ["Old spreadsheet was empty"])
 
     title_row = spreadsheet_cells[0]
     data_rows = spreadsheet_cells[1:]
@@ -369,7 +636,7 @@ def _extract_data_from_previous_spreadsheet(
         logging.warning(
             f"Could not find Name column in spreadsheet. Title columns were {','.join(title_row)}"
         )
-        return PowerHourImportData(None, None, import_messages)
+        return PowerHourImportData([], {}, import_messages)
 
     extra_columns_by_council_member_name: Dict[str, Dict[str, str]] = {}
     for row in data_rows:
@@ -396,54 +663,82 @@ def _extract_data_from_previous_spreadsheet(
         )
 
     # Now rekey by legislator ID
-    council_members = CouncilMember.query.all()
-    column_data_by_council_member_id: Dict[UUID, Dict[str, str]] = {}
-    for council_member in council_members:
-        council_member_data = extra_columns_by_council_member_name.get(
-            council_member.person.name
+    column_data_by_legislator_id: Dict[UUID, Dict[str, str]] = {}
+    for legislator in legislators:
+        legislator_data = extra_columns_by_council_member_name.get(
+            legislator.person.name
         )
-        if council_member_data is None:
-            council_member_data = extra_columns_by_council_member_name.get(
-                _get_sponsor_name_text(council_member.person.name, True)
+        if legislator_data is None:
+            legislator_data = extra_columns_by_council_member_name.get(
+                _get_sponsor_name_text(legislator.person.name, True)
             )
-        if council_member_data is not None:
-            column_data_by_council_member_id[
-                council_member.person_id
-            ] = council_member_data
+        if legislator_data is not None:
+            column_data_by_legislator_id[
+                legislator.person_id
+            ] = legislator_data
         else:
             import_messages.append(
-                f"Could not find {council_member.person.name} under the Name column in the old sheet. Make sure the name matches exactly."
+                f"Could not find {legislator.person.name} under the Name column in the old sheet. Make sure the name matches exactly."
             )
 
     return PowerHourImportData(
         extra_column_titles=titles,
-        column_data_by_legislator_id=column_data_by_council_member_id,
+        column_data_by_legislator_id=column_data_by_legislator_id,
         import_messages=import_messages,
     )
 
 
-def _extract_data_from_previous_power_hour(
-    spreadsheet_id,
-) -> Optional[PowerHourImportData]:
+def _import_previous_power_hour(
+    spreadsheet_id, tabs: List[PowerHourTab]
+) -> List[str]:
     """Reads cells from the spreadsheet of a previous power hour and extracts
-    some data that should be copied into the next power hour, to preserve context
-    for new callers. It follows these rules:
-      * First it seeks to find the row for each legislator. It searches for a Name
+    some data that should be copied into each tab of the next power hour, to
+    preserve context for new callers. It follows these rules:
+      * Each titled tab imports from the old tab with the same title. An
+        untitled tab imports from the first tab.
+      * Then it seeks to find the row for each legislator. It searches for a Name
         column, and then does an exact string match of the legislator name within
         that column.
       * For each legislator, it imports data for all *extra columns* that aren't one
         of the autogenerated ones. In other words, columns that were added when
         customizing the spreadsheet after it was generated.
+
+    Returns messages about what was imported, for the user.
     """
-    google_credentials = _get_google_credentials()
-    sheets_service = _get_sheets_service(google_credentials)
+    sheets_service = _get_sheets_service()
 
-    # TODO: Use a field mask instead of includeGridData=true to return less data
     spreadsheet = (
         sheets_service.spreadsheets()
-        .get(spreadsheetId=spreadsheet_id, includeGridData=True)
+        .get(
+            spreadsheetId=spreadsheet_id,
+            includeGridData=True,
+            fields=PREVIOUS_POWER_HOUR_FIELDS,
+        )
         .execute()
     )
+    sheets = spreadsheet["sheets"]
+    sheets_by_title = {
+        sheet.get("properties", {}).get("title"): sheet for sheet in sheets
+    }
+
+    import_messages = []
+    for tab in tabs:
+        if tab.title:
+            sheet = sheets_by_title.get(tab.title)
+            if sheet is None:
+                import_messages.append(
+                    f"Old spreadsheet has no {tab.title} tab, so nothing was copied to it"
+                )
+                continue
+        else:
+            sheet = sheets[0]
+
+        tab.import_data = _extract_data_from_previous_spreadsheet(
+            _get_raw_cell_data(sheet), tab.legislators
+        )
+        import_messages.extend(
+            f"{tab.title}: {message}" if tab.title else message
+            for message in tab.import_data.import_messages
+        )
 
-    raw_cell_data = _get_raw_cell_data(spreadsheet)
-    return _extract_data_from_previous_spreadsheet(raw_cell_data)
+    return import_messages
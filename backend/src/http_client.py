@@ -0,0 +1,196 @@
+"""A small wrapper around a requests Session that's shared by the clients for
+the external legislative APIs. It keeps connections alive between calls, retries
+transient failures, and counts what it does so each cron run can log it."""
+
+import json
+import logging
+import random
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from time import monotonic, sleep, time
+from typing import Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .response_cache import CachedResponse, ResponseCache
+
+# 429 means we're being rate limited, and the 5xx errors are usually a
+# temporary blip on their end.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_TIMEOUT_SECONDS = (5, 30)  # (connect, read)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1
+MAX_BACKOFF_SECONDS = 30
+DEFAULT_POOL_SIZE = 10
+
+
+@dataclass
+class HttpClientStats:
+    requests: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    total_latency_seconds: float = 0
+
+    def __str__(self):
+        average_ms = (
+            self.total_latency_seconds / self.requests * 1000
+            if self.requests
+            else 0
+        )
+        return (
+            f"{self.requests} requests, {self.retries} retries, "
+            f"{self.bytes_received} bytes, {average_ms:.0f}ms average latency"
+        )
+
+
+class HttpClient:
+    """Makes GET requests against a single JSON API using a pool of keep-alive
+    connections. Safe to share between threads.
+
+    If a cache is given, get() can reuse earlier responses. See get() for
+    details."""
+
+    def __init__(
+        self,
+        base_url,
+        *,
+        name,
+        default_params=None,
+        timeout=DEFAULT_TIMEOUT_SECONDS,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_seconds=DEFAULT_BACKOFF_SECONDS,
+        pool_size=DEFAULT_POOL_SIZE,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.base_url = base_url
+        self.name = name
+        self.default_params = default_params or {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self.stats = HttpClientStats()
+
+    def _get_backoff_seconds(self, attempt, response):
+        retry_after = (
+            response.headers.get("Retry-After")
+            if response is not None
+            else None
+        )
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF_SECONDS)
+
+        # Exponential backoff with full jitter, so that parallel callers don't
+        # all retry at the same moment.
+        backoff = min(self.backoff_seconds * 2 ** attempt, MAX_BACKOFF_SECONDS)
+        return random.uniform(0, backoff)
+
+    def _record(self, response, latency_seconds, *, is_retry):
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.total_latency_seconds += latency_seconds
+            if is_retry:
+                self.stats.retries += 1
+            if response is not None:
+                self.stats.bytes_received += len(response.content)
+
+    def get_response(self, path, *, params=None, headers=None):
+        """Returns the raw response for a GET request, after retrying any
+        transient failures. Raises for any error status that remains."""
+        url = f"{self.base_url}{path}"
+        params = {**self.default_params, **(params or {})}
+
+        attempt = 0
+        while True:
+            start = monotonic()
+            try:
+                response = self.session.get(
+                    url, params=params, headers=headers, timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(None, monotonic() - start, is_retry=attempt > 0)
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                self._record(
+                    response, monotonic() - start, is_retry=attempt > 0
+                )
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self.max_retries
+                ):
+                    response.raise_for_status()
+                    return response
+
+            backoff = self._get_backoff_seconds(attempt, response)
+            logging.warning(
+                f"{self.name} request to {path} failed "
+                f"({response.status_code if response is not None else 'connection error'}), "
+                f"retrying in {backoff:.1f}s"
+            )
+            sleep(backoff)
+            attempt += 1
+
+    def _get_cache_key(self, path, params):
+        # The default params are left out so that the API key isn't stored
+        return f"{path}?{urlencode(sorted((params or {}).items()))}"
+
+    def get(self, path, *, params=None, cache_ttl: Optional[timedelta] = None):
+        """Returns the JSON body of a GET request.
+
+        When the client has a cache and a cache_ttl is given, a cached response
+        younger than cache_ttl is returned without making a request. An older
+        one is revalidated by sending its ETag and Last-Modified values, so if
+        the API answers 304 Not Modified we reuse it without downloading it
+        again.
+        """
+        if not self.cache or cache_ttl is None:
+            return self.get_response(path, params=params).json()
+
+        key = self._get_cache_key(path, params)
+        entry = self.cache.get(key)
+        if entry and time() - entry.fetched_at < cache_ttl.total_seconds():
+            self.cache.record("hits")
+            return json.loads(entry.body)
+
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.get_response(path, params=params, headers=headers)
+        if entry and response.status_code == 304:
+            self.cache.record("revalidations")
+            entry.fetched_at = time()
+        else:
+            self.cache.record("misses")
+            entry = CachedResponse(
+                body=response.text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time(),
+            )
+        self.cache.set(key, entry)
+        return json.loads(entry.body)
+
+    def reset_stats(self):
+        """Returns the stats gathered so far and starts counting from zero."""
+        with self._stats_lock:
+            stats = self.stats
+            self.stats = HttpClientStats()
+        return stats
@@ -0,0 +1,115 @@
+"""Helpers for writing legislator data pulled from the external APIs in bulk,
+rather than looking up and saving each legislator one at a time."""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple, Union
+from uuid import uuid4
+
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models import db
+from .models import (
+    AssemblyMember,
+    CouncilMember,
+    OfficeContact,
+    Person,
+    Senator,
+)
+
+# Column values for the Person row, and for the row in the role-specific table
+ColumnValues = Dict[str, Any]
+
+
+def upsert_legislators(
+    *,
+    representative_model: Union[CouncilMember, Senator, AssemblyMember],
+    key_column,
+    person_type: Person.PersonType,
+    values_by_key: Dict[Any, Tuple[ColumnValues, ColumnValues]],
+):
+    """Inserts or updates a whole set of legislators of one kind using a
+    single query to find the existing ones, plus one INSERT ... ON CONFLICT
+    each for the persons table and the role-specific table.
+
+    key_column is the column of representative_model that holds the
+    legislator's ID in the external API, like
+    CouncilMember.city_council_person_id. values_by_key maps those IDs to a
+    pair of (person values, representative values). Every entry must set the
+    same columns.
+    """
+    if not values_by_key:
+        return
+
+    existing_person_ids = dict(
+        db.session.query(key_column, representative_model.person_id).filter(
+            key_column.in_(values_by_key.keys())
+        )
+    )
+
+    person_rows = []
+    representative_rows = []
+    for key, (person_values, representative_values) in values_by_key.items():
+        person_id = existing_person_ids.get(key) or uuid4()
+        person_rows.append(
+            {**person_values, "id": person_id, "type": person_type}
+        )
+        representative_rows.append(
+            {
+                **representative_values,
+                key_column.key: key,
+                "person_id": person_id,
+            }
+        )
+
+    _insert_or_update(Person, person_rows, conflict_column=Person.id)
+    _insert_or_update(
+        representative_model, representative_rows, conflict_column=key_column
+    )
+
+    logging.info(
+        f"Added {len(values_by_key) - len(existing_person_ids)} and updated {len(existing_person_ids)} {representative_model.__tablename__}"
+    )
+
+
+def _insert_or_update(model, rows, *, conflict_column):
+    statement = insert(model).values(rows)
+    primary_key_columns = {c.key for c in model.__table__.primary_key}
+    update_columns = (
+        set(rows[0].keys()) - primary_key_columns - {conflict_column.key}
+    )
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={c: statement.excluded[c] for c in update_columns},
+        )
+    )
+
+
+def _get_office_contact_key(contact: OfficeContact):
+    return (contact.type, contact.phone, contact.fax, contact.city)
+
+
+def reconcile_office_contacts(
+    person: Person, desired_contacts: List[OfficeContact]
+):
+    """Makes a person's office contacts match desired_contacts, comparing them
+    by type, phone, fax and city. Only the contacts that differ are removed or
+    added, so syncing a person whose contacts haven't changed writes nothing.
+    """
+    unmatched_counts = Counter(
+        _get_office_contact_key(c) for c in desired_contacts
+    )
+    for contact in list(person.office_contacts):
+        key = _get_office_contact_key(contact)
+        if unmatched_counts[key]:
+            unmatched_counts[key] -= 1
+        else:
+            # This gets deleted by the delete-orphan cascade
+            person.office_contacts.remove(contact)
+
+    for contact in desired_contacts:
+        key = _get_office_contact_key(contact)
+        if unmatched_counts[key]:
+            unmatched_counts[key] -= 1
+            person.office_contacts.append(contact)
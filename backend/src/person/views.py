@@ -6,7 +6,15 @@ from werkzeug import exceptions
 from ..app import app
 from ..auth import auth_required
 from ..models import db
-from .models import OfficeContact, Person, Staffer
+from ..resource_versions.tracking import conditional_get
+from .models import (
+    AssemblyMember,
+    CouncilMember,
+    OfficeContact,
+    Person,
+    Senator,
+    Staffer,
+)
 from .schema import (
     CreateStafferSchema,
     OfficeContactSchema,
@@ -15,8 +23,13 @@ from .schema import (
 )
 
 
+# The tables PersonSchema draws from
+PERSON_MODELS = (Person, CouncilMember, Senator, AssemblyMember)
+
+
 @app.route("/api/persons", methods=["GET"])
 @auth_required
+@conditional_get(*PERSON_MODELS)
 def get_persons():
     persons = Person.query.order_by(Person.name).all()
     return PersonSchema(many=True).jsonify(persons)
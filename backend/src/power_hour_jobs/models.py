@@ -0,0 +1,53 @@
+import enum
+from uuid import uuid4
+
+from sqlalchemy import Column, Enum, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import relationship
+
+from ..bill.models import Bill, PowerHour
+from ..models import TIMESTAMP, UUID, db
+from ..utils import now
+
+
+class PowerHourJob(db.Model):
+    """
+    A request to create a power hour spreadsheet. Creating one takes several
+    Google API calls, so it's done in the background rather than while the
+    user's request waits, and the user polls this for the result."""
+
+    __tablename__ = "power_hour_jobs"
+
+    class Status(enum.Enum):
+        PENDING = 1
+        RUNNING = 2
+        SUCCEEDED = 3
+        FAILED = 4
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+
+    bill_id = Column(UUID, ForeignKey(Bill.id), nullable=False, index=True)
+    bill = relationship(Bill, back_populates="power_hour_jobs")
+
+    title = Column(Text, nullable=False)
+    spreadsheet_id_to_import = Column(Text)
+
+    status = Column(
+        Enum(Status, name="powerhourjobstatus"),
+        nullable=False,
+        default=Status.PENDING,
+        index=True,
+    )
+
+    # Messages for the user about what was imported, and the error if it
+    # failed
+    messages = Column(ARRAY(Text), nullable=False, default=list)
+    error = Column(Text)
+
+    # Set once the spreadsheet is created
+    power_hour_id = Column(UUID, ForeignKey(PowerHour.id))
+    power_hour = relationship(PowerHour)
+
+    created_at = Column(TIMESTAMP, nullable=False, default=now)
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
@@ -0,0 +1,169 @@
+"""Creates power hour spreadsheets in the background. Jobs are stored in the
+database, and by default each one is run on a thread of the process that
+queued it. With POWER_HOUR_JOB_RUNNER=worker they're instead left for a
+separate worker process, started with `flask power-hour-worker`.
+
+The cron also runs any jobs still waiting, such as ones queued on a thread
+just before a restart, and fails jobs whose runner died partway through."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from time import sleep
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import update
+
+from ..app import app
+from ..bill.models import PowerHour
+from ..google_sheets import create_power_hour
+from ..models import db
+from ..settings import POWER_HOUR_JOB_MAX_CONCURRENCY, POWER_HOUR_JOB_RUNNER
+from ..utils import now
+from .models import PowerHourJob
+
+POLL_INTERVAL_SECONDS = 2
+
+# Creating a spreadsheet takes well under a minute, so a job that's been
+# running this long belongs to a thread or worker that died
+STALE_JOB_TIMEOUT = timedelta(minutes=15)
+
+# Shown to users instead of the exception, which is only logged
+JOB_FAILED_ERROR = "Failed to create the power hour spreadsheet"
+
+_executor = ThreadPoolExecutor(
+    max_workers=POWER_HOUR_JOB_MAX_CONCURRENCY,
+    thread_name_prefix="power-hour-job",
+)
+
+
+def enqueue_power_hour_job(
+    bill_id: UUID, title: str, spreadsheet_id_to_import: Optional[str]
+) -> PowerHourJob:
+    """Queues a power hour to be created, and commits so that the job is
+    visible to whichever thread or process runs it."""
+    job = PowerHourJob(
+        bill_id=bill_id,
+        title=title,
+        spreadsheet_id_to_import=spreadsheet_id_to_import,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if POWER_HOUR_JOB_RUNNER == "thread":
+        _executor.submit(_run_job_in_app_context, job.id)
+    return job
+
+
+def _run_job_in_app_context(job_id):
+    with app.app_context():
+        try:
+            run_power_hour_job(job_id)
+        except Exception:
+            logging.exception(
+                f"Unhandled exception in power hour job {job_id}"
+            )
+
+
+def _claim_job(job_id) -> bool:
+    """Marks the job as running, unless something else already claimed it"""
+    result = db.session.execute(
+        update(PowerHourJob)
+        .where(
+            PowerHourJob.id == job_id,
+            PowerHourJob.status == PowerHourJob.Status.PENDING,
+        )
+        .values(status=PowerHourJob.Status.RUNNING, started_at=now())
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def run_power_hour_job(job_id) -> bool:
+    """Creates the job's spreadsheet and records the result. Returns whether
+    this call ran the job."""
+    if not _claim_job(job_id):
+        return False
+
+    job = PowerHourJob.query.get(job_id)
+    try:
+        spreadsheet, messages = create_power_hour(
+            job.bill_id, job.title, job.spreadsheet_id_to_import
+        )
+    except Exception:
+        logging.exception(f"Failed to create power hour for job {job_id}")
+        db.session.rollback()
+        job.status = PowerHourJob.Status.FAILED
+        job.error = JOB_FAILED_ERROR
+        job.finished_at = now()
+        db.session.commit()
+        return True
+
+    job.power_hour = PowerHour(
+        bill_id=job.bill_id,
+        spreadsheet_url=spreadsheet["spreadsheetUrl"],
+        spreadsheet_id=spreadsheet["spreadsheetId"],
+        title=job.title,
+    )
+    job.messages = messages
+    job.status = PowerHourJob.Status.SUCCEEDED
+    job.finished_at = now()
+    db.session.commit()
+    return True
+
+
+def fail_stale_power_hour_jobs() -> int:
+    """Fails jobs that have been running for too long, so that users polling
+    them stop waiting. Returns how many there were."""
+    result = db.session.execute(
+        update(PowerHourJob)
+        .where(
+            PowerHourJob.status == PowerHourJob.Status.RUNNING,
+            PowerHourJob.started_at < now() - STALE_JOB_TIMEOUT,
+        )
+        .values(
+            status=PowerHourJob.Status.FAILED,
+            error=JOB_FAILED_ERROR,
+            finished_at=now(),
+        )
+    )
+    db.session.commit()
+    if result.rowcount:
+        logging.warning(f"Failed {result.rowcount} stale power hour jobs")
+    return result.rowcount
+
+
+def run_pending_power_hour_jobs() -> int:
+    """Fails stale jobs, then runs queued jobs, oldest first, until there are
+    none left. Returns how many this call ran."""
+    fail_stale_power_hour_jobs()
+
+    count = 0
+    while True:
+        job_id = (
+            db.session.query(PowerHourJob.id)
+            .filter(PowerHourJob.status == PowerHourJob.Status.PENDING)
+            .order_by(PowerHourJob.created_at)
+            .limit(1)
+            .scalar()
+        )
+        if not job_id:
+            return count
+
+        # Another worker may claim it first, in which case look again
+        if run_power_hour_job(job_id):
+            count += 1
+
+
+@app.cli.command("power-hour-worker")
+def power_hour_worker_command():
+    logging.info("Power hour worker starting")
+    while True:
+        try:
+            run_pending_power_hour_jobs()
+        except Exception:
+            logging.exception("Unhandled exception in power hour worker")
+            db.session.rollback()
+
+        sleep(POLL_INTERVAL_SECONDS)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Text
+
+from ..models import TIMESTAMP, db
+from ..utils import now
+
+
+class ResourceVersion(db.Model):
+    """
+    A version for each table that API responses are built from. Any commit
+    that writes to a table bumps its version in the same transaction, so read
+    views can tell whether a client's copy is current without loading it."""
+
+    __tablename__ = "resource_versions"
+
+    # The table's name
+    name = Column(Text, primary_key=True)
+
+    version = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=False, default=now)
@@ -0,0 +1,155 @@
+"""Answers conditional GETs for read views using the resource versions.
+
+The versions are bumped by session hooks rather than by the code that writes,
+so that user edits, the cron, and the workers are all covered. Both ORM
+changes and insert/update/delete statements run through the session are
+recorded, and the tables they touched are bumped just before the commit."""
+
+from functools import wraps
+from hashlib import sha256
+from itertools import chain
+
+from flask import make_response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import object_mapper
+
+from ..app import app
+from ..models import db
+from ..utils import now
+from .models import ResourceVersion
+
+# Session.info key for the tables written since the last commit
+CHANGED_TABLES_KEY = "resource_versions_changed_tables"
+
+
+def _get_changed_tables(session) -> set:
+    return session.info.setdefault(CHANGED_TABLES_KEY, set())
+
+
+@event.listens_for(db.session, "after_flush")
+def _record_flushed_tables(session, flush_context):
+    # The new, dirty, and deleted sets still show what was just flushed
+    changed_tables = _get_changed_tables(session)
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in chain(session.new, modified, session.deleted):
+        changed_tables.update(
+            table.name for table in object_mapper(obj).tables
+        )
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _record_statement_table(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+
+    table_name = orm_execute_state.statement.table.name
+    if table_name != ResourceVersion.__tablename__:
+        _get_changed_tables(orm_execute_state.session).add(table_name)
+
+
+@event.listens_for(db.session, "before_commit")
+def _bump_changed_versions(session):
+    # The commit's own flush comes after this hook, so flush now to find
+    # every table this commit writes to
+    session.flush()
+    table_names = session.info.pop(CHANGED_TABLES_KEY, None)
+    if not table_names:
+        return
+
+    # Sorted, so that concurrent commits lock the rows in the same order
+    statement = insert(ResourceVersion).values(
+        [
+            {"name": name, "version": 1, "updated_at": now()}
+            for name in sorted(table_names)
+        ]
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ResourceVersion.name],
+            set_={
+                "version": ResourceVersion.version + 1,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
+@event.listens_for(db.session, "after_transaction_end")
+def _forget_rolled_back_tables(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(CHANGED_TABLES_KEY, None)
+
+
+def _get_validators(table_names):
+    """Returns an ETag and Last-Modified time covering the given tables"""
+    versions = (
+        db.session.query(
+            ResourceVersion.name,
+            ResourceVersion.version,
+            ResourceVersion.updated_at,
+        )
+        .filter(ResourceVersion.name.in_(table_names))
+        .order_by(ResourceVersion.name)
+        .all()
+    )
+    # The update times are included so that versions restarting in a new
+    # database can't match an ETag from the old one
+    content = "\n".join(
+        f"{name}:{version}:{updated_at.isoformat()}"
+        for name, version, updated_at in versions
+    )
+    etag = sha256(content.encode("utf-8")).hexdigest()[:32]
+    last_modified = max((v.updated_at for v in versions), default=None)
+    return etag, last_modified
+
+
+def _is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        # HTTP dates only have whole seconds
+        return (
+            last_modified.replace(microsecond=0) <= request.if_modified_since
+        )
+    return False
+
+
+def conditional_get(*models):
+    """For read views whose responses only depend on the given models'
+    tables. Sets an ETag and Last-Modified from their versions, and answers a
+    request for a current copy with a 304, without running the view.
+
+    Responses are marked no-cache, so that browsers check back each time
+    rather than guessing how long the data stays fresh."""
+    table_names = sorted(
+        {table.name for model in models for table in inspect(model).tables}
+    )
+
+    def decorator(view_fn):
+        @wraps(view_fn)
+        def check_versions_and_run(*args, **kwargs):
+            # Read before the view runs, so that a write committed in between
+            # can only leave the ETag older than the data, never newer
+            etag, last_modified = _get_validators(table_names)
+            if _is_not_modified(etag, last_modified):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view_fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+
+        return check_versions_and_run
+
+    return decorator
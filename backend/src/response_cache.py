@@ -0,0 +1,145 @@
+"""A cache for responses from the external APIs, so that repeated cron runs
+can reuse data that rarely changes instead of downloading it again.
+
+Entries are kept in memory by default. Setting a file path stores them in
+SQLite instead, so they survive restarts and are shared between processes.
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CachedResponse:
+    body: str
+
+    # Validators from the response headers, used to ask the API whether the
+    # response changed without downloading it again.
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    # Unix timestamp of when the response was fetched or last revalidated.
+    fetched_at: float
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    revalidations: int = 0
+    misses: int = 0
+
+    def __str__(self):
+        return f"{self.hits} cache hits, {self.revalidations} revalidated, {self.misses} misses"
+
+
+class MemoryCacheBackend:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCacheBackend:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _get_connection(self):
+        # Only called while holding the lock, which also makes it safe to
+        # share the connection between threads.
+        if not self._connection:
+            self._connection = sqlite3.connect(
+                self.path, check_same_thread=False
+            )
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                )"""
+            )
+        return self._connection
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+        return CachedResponse(*row) if row else None
+
+    def set(self, key, entry: CachedResponse):
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.body,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fetched_at,
+                ),
+            )
+            connection.commit()
+
+    def clear(self):
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._stats_lock = threading.Lock()
+        self.stats = ResponseCacheStats()
+
+    def get(self, key) -> Optional[CachedResponse]:
+        return self.backend.get(key)
+
+    def set(self, key, entry: CachedResponse):
+        self.backend.set(key, entry)
+
+    def clear(self):
+        self.backend.clear()
+
+    def record(self, result):
+        """Counts a lookup as one of "hits", "revalidations" or "misses"."""
+        with self._stats_lock:
+            setattr(self.stats, result, getattr(self.stats, result) + 1)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            stats = self.stats
+            self.stats = ResponseCacheStats()
+        return stats
+
+
+def create_response_cache(path=None):
+    """Creates a cache backed by SQLite at the given path, or in memory if
+    there's no path."""
+    return ResponseCache(
+        SqliteCacheBackend(path) if path else MemoryCacheBackend()
+    )
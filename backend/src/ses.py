@@ -1,11 +1,10 @@
 """Utilities for using AWS's Simple Email Service to send emails."""
 
 import logging
+from dataclasses import dataclass
 
 from boto3 import client
 from botocore.exceptions import ClientError
-from flask import render_template
-from werkzeug import exceptions
 
 from .settings import APP_TITLE
 
@@ -16,9 +15,25 @@ client = client("ses")
 SENDER = f"{APP_TITLE} <no-reply@350billtracker.com>"
 CHARSET = "UTF-8"
 
+# The error code SES uses when we go over our sending rate or daily quota
+THROTTLING_ERROR_CODE = "Throttling"
 
-def send_email(email, subject, body_html, body_text):
-    response = client.send_email(
+
+@dataclass
+class DeliveryReport:
+    sent: int = 0
+    failed: int = 0
+
+    # Emails that SES rejected because we're sending too fast or ran out of
+    # quota. These aren't counted as failed.
+    throttled: int = 0
+
+    def __str__(self):
+        return f"{self.sent} sent, {self.failed} failed, {self.throttled} throttled"
+
+
+def send_email(email, subject, body_html, body_text, *, ses_client=None):
+    response = (ses_client or client).send_email(
         Destination={
             "ToAddresses": [email],
         },
@@ -43,16 +58,11 @@ def send_email(email, subject, body_html, body_text):
     logging.info(
         f"Email sent successfully to {email}, message ID: {response['MessageId']}"
     )
+    return response["MessageId"]
 
 
-def send_login_link_email(email_address, login_link):
-    body_text = render_template("login_email.txt", login_link=login_link)
-    body_html = render_template("login_email.html", login_link=login_link)
-
-    try:
-        send_email(
-            email_address, "Log in to 350 Bill Tracker", body_html, body_text
-        )
-    except ClientError as e:
-        logging.exception(e)
-        raise exceptions.ServiceUnavailable("Could not send email")
+def is_throttling_error(error: Exception):
+    return (
+        isinstance(error, ClientError)
+        and error.response["Error"]["Code"] == THROTTLING_ERROR_CODE
+    )
@@ -3,6 +3,15 @@ from base64 import b64decode
 
 CITY_COUNCIL_API_TOKEN = os.environ.get("CITY_COUNCIL_API_TOKEN")
 
+# Limits for how hard the cron can hit the City Council API when it makes
+# requests in parallel.
+CITY_COUNCIL_API_MAX_CONCURRENCY = int(
+    os.environ.get("CITY_COUNCIL_API_MAX_CONCURRENCY", "8")
+)
+CITY_COUNCIL_API_MAX_REQUESTS_PER_SECOND = float(
+    os.environ.get("CITY_COUNCIL_API_MAX_REQUESTS_PER_SECOND", "10")
+)
+
 GOOGLE_CREDENTIALS = b64decode(
     os.environ["GOOGLE_CREDENTIALS"].encode("utf-8")
 ).decode("utf-8")
@@ -13,6 +22,11 @@ AWS_ACCESS_KEY_ID = os.environ["AWS_ACCESS_KEY_ID"]
 AWS_SECRET_ACCESS_KEY = os.environ["AWS_SECRET_ACCESS_KEY"]
 AWS_DEFAULT_REGION = os.environ["AWS_DEFAULT_REGION"]
 
+# Limits for sending emails in parallel. The rate should stay under the
+# account's SES maximum send rate.
+SES_MAX_CONCURRENCY = int(os.environ.get("SES_MAX_CONCURRENCY", "8"))
+SES_MAX_SEND_RATE = float(os.environ.get("SES_MAX_SEND_RATE", "14"))
+
 APP_ORIGIN = os.environ["APP_ORIGIN"]
 
 ENABLE_CRON = os.environ.get("ENABLE_CRON", "True") == "True"
@@ -21,6 +35,23 @@ APP_TITLE = os.environ.get("APP_TITLE", "350 Brooklyn Bill Tracker")
 
 SENATE_API_TOKEN = os.environ["SENATE_API_TOKEN"]
 
+# Where to keep cached NY Senate API responses so they survive restarts. If
+# unset, they're only cached in memory.
+SENATE_API_CACHE_PATH = os.environ.get("SENATE_API_CACHE_PATH")
+
+# How many requests the cron makes to the NY Senate API at once
+SENATE_API_MAX_CONCURRENCY = int(
+    os.environ.get("SENATE_API_MAX_CONCURRENCY", "8")
+)
+
+# Where power hour spreadsheets get created: "thread" runs them in the
+# background of the web server, and "worker" leaves them for a separate
+# `flask power-hour-worker` process.
+POWER_HOUR_JOB_RUNNER = os.environ.get("POWER_HOUR_JOB_RUNNER", "thread")
+POWER_HOUR_JOB_MAX_CONCURRENCY = int(
+    os.environ.get("POWER_HOUR_JOB_MAX_CONCURRENCY", "4")
+)
+
 DISABLE_STRICT_TRANSPORT_SECURITY = (
     os.environ.get("DISABLE_STRICT_TRANSPORT_SECURITY") == "True"
 )
@@ -133,22 +133,26 @@ class AssemblySponsorship(db.Model, StateSponsorshipMixin):
     representative_class = AssemblyMember
 
 
-# This may be inefficient because it loads this on every bill even if these fields aren't needed
+# These are deferred, so they're only counted for bills that they're read from.
+# Listing many bills should count them all at once instead, like /api/bills.
 CityBill.sponsor_count = column_property(
     select(func.count(CitySponsorship.id))
     .where(CitySponsorship.bill_id == CityBill.bill_id)
     .correlate_except(CitySponsorship)
-    .scalar_subquery()
+    .scalar_subquery(),
+    deferred=True,
 )
 SenateBill.sponsor_count = column_property(
     select(func.count(SenateSponsorship.id))
     .where(SenateSponsorship.bill_id == SenateBill.bill_id)
     .correlate_except(SenateSponsorship)
-    .scalar_subquery()
+    .scalar_subquery(),
+    deferred=True,
 )
 AssemblyBill.sponsor_count = column_property(
     select(func.count(AssemblySponsorship.id))
     .where(AssemblySponsorship.bill_id == AssemblyBill.bill_id)
     .correlate_except(AssemblySponsorship)
-    .scalar_subquery()
+    .scalar_subquery(),
+    deferred=True,
 )
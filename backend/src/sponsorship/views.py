@@ -8,6 +8,8 @@ from ..app import app
 from ..auth import auth_required
 from ..bill.models import CityBill, StateBill
 from ..person.models import AssemblyMember, Person, Senator
+from ..person.views import PERSON_MODELS
+from ..resource_versions.tracking import conditional_get
 from .models import AssemblySponsorship, CitySponsorship, SenateSponsorship
 from .schema import (
     CouncilMemberSponsorshipSchema,
@@ -32,6 +34,7 @@ def council_member_sponsorships(council_member_id):
 
 @app.route("/api/city-bills/<uuid:bill_id>/sponsorships", methods=["GET"])
 @auth_required
+@conditional_get(CityBill, CitySponsorship, *PERSON_MODELS)
 def city_bill_sponsorships(bill_id):
     city_bill = CityBill.query.get(bill_id)
     if not city_bill:
@@ -92,6 +95,9 @@ def _get_state_sponsorship_list(
 
 @app.route("/api/state-bills/<uuid:bill_id>/sponsorships", methods=["GET"])
 @auth_required
+@conditional_get(
+    StateBill, SenateSponsorship, AssemblySponsorship, *PERSON_MODELS
+)
 def state_bill_sponsorships(bill_id):
     state_bill = StateBill.query.get(bill_id)
     if not state_bill:
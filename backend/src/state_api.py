@@ -1,8 +1,8 @@
 import logging
 from collections import defaultdict
-from typing import Union
-
-import requests
+from datetime import datetime, timedelta
+from typing import Set, Tuple, Union
+from zoneinfo import ZoneInfo
 
 from .bill.models import (
     AssemblyBill,
@@ -11,11 +11,18 @@ from .bill.models import (
     StateBill,
     StateChamber,
 )
+from .http_client import HttpClient
 from .models import db
 from .person.models import AssemblyMember, Person, Senator
-from .settings import SENATE_API_TOKEN
+from .person.sync import upsert_legislators
+from .response_cache import create_response_cache
+from .settings import (
+    SENATE_API_CACHE_PATH,
+    SENATE_API_MAX_CONCURRENCY,
+    SENATE_API_TOKEN,
+)
 from .sponsorship.models import AssemblySponsorship, SenateSponsorship
-from .utils import cron_function
+from .utils import cron_function, fetch_concurrently, now
 
 # API docs: https://legislation.nysenate.gov/static/docs/html/
 # See also https://www.nysenate.gov/how-bill-becomes-law
@@ -29,40 +36,52 @@ CCIA_TERM = "2021"
 CURRENT_SESSION_YEAR = "2021"
 
 
-def senate_get(path: str, **params):
-    response = requests.get(
-        f"https://legislation.nysenate.gov/api/3/{path}",
-        params={**params, "key": SENATE_API_TOKEN},
-    )
-    response.raise_for_status()
-    return response.json()["result"]
+# The API's timestamps are in New York local time, with no offset.
+SENATE_API_TIMEZONE = ZoneInfo("America/New_York")
 
+# The member list only changes when someone joins or leaves office, so it's
+# fine for it to be a day old. Bills are revalidated more often so that status
+# changes still make it into the next round of notifications.
+MEMBERS_CACHE_TTL = timedelta(hours=24)
+BILL_CACHE_TTL = timedelta(minutes=30)
 
-def _add_sponsorship(
-    *,
-    chamber_bill,
-    sponsor_data,
-    sponsorship_model: Union[AssemblySponsorship, SenateSponsorship],
-    representative_model: Union[AssemblyMember, Senator],
-    is_lead_sponsor,
+BILL_UPDATES_PAGE_SIZE = 1000
+
+# Updates processed within this long before a bill's last sync are fetched
+# again, in case the API's clock is a little behind ours. Refreshing a bill
+# that didn't really change is harmless.
+SYNC_OVERLAP = timedelta(minutes=15)
+
+senate_client = HttpClient(
+    "https://legislation.nysenate.gov/api/3/",
+    name="Senate API",
+    default_params={"key": SENATE_API_TOKEN},
+    cache=create_response_cache(SENATE_API_CACHE_PATH),
+)
+
+
+def senate_get(path: str, *, cache_ttl: timedelta = None, **params):
+    """Responses are only cached when a cache_ttl is given."""
+    return senate_client.get(path, params=params, cache_ttl=cache_ttl)[
+        "result"
+    ]
+
+
+def _get_people_by_member_id(
+    representative_model: Union[AssemblyMember, Senator], member_ids
 ):
-    member_id = sponsor_data["memberId"]
-    representative = representative_model.query.filter_by(
-        state_member_id=member_id
-    ).one_or_none()
-    if representative:
-        sponsorship = sponsorship_model(
-            person_id=representative.person_id,
-            is_lead_sponsor=is_lead_sponsor,
-        )
-        chamber_bill.sponsorships.append(sponsorship)
-        logging.info(
-            f"Added sponsorship for {representative.person.name} to bill {chamber_bill.base_print_no}"
-        )
-    else:
-        logging.warning(
-            f"Did not find {sponsor_data['fullName']}, member_id: {member_id} for sponsorship on bill {chamber_bill.base_print_no}"
+    """Looks up the legislators with the given state member IDs in a single
+    query. Returns their (person ID, name), keyed by member ID."""
+    rows = (
+        db.session.query(
+            representative_model.state_member_id, Person.id, Person.name
         )
+        .join(Person, Person.id == representative_model.person_id)
+        .filter(representative_model.state_member_id.in_(member_ids))
+    )
+    return {
+        member_id: (person_id, name) for member_id, person_id, name in rows
+    }
 
 
 def _add_chamber_sponsorships(
@@ -75,22 +94,37 @@ def _add_chamber_sponsorships(
     active_amendment = chamber_data["amendments"]["items"][
         chamber_data["activeVersion"]
     ]
-    lead_sponsor = chamber_data["sponsor"]["member"]
-    _add_sponsorship(
-        chamber_bill=chamber_bill,
-        sponsor_data=lead_sponsor,
-        sponsorship_model=sponsorship_model,
-        representative_model=representative_model,
-        is_lead_sponsor=True,
+    # Pairs of sponsor data and whether they're the lead sponsor
+    sponsors = [(chamber_data["sponsor"]["member"], True)] + [
+        (sponsor, False) for sponsor in active_amendment["coSponsors"]["items"]
+    ]
+    people_by_member_id = _get_people_by_member_id(
+        representative_model,
+        {sponsor_data["memberId"] for sponsor_data, _ in sponsors},
     )
-    for sponsor in active_amendment["coSponsors"]["items"]:
-        _add_sponsorship(
-            chamber_bill=chamber_bill,
-            sponsor_data=sponsor,
-            sponsorship_model=sponsorship_model,
-            representative_model=representative_model,
-            is_lead_sponsor=False,
+
+    sponsorships = []
+    sponsor_names = []
+    for sponsor_data, is_lead_sponsor in sponsors:
+        member_id = sponsor_data["memberId"]
+        if member_id not in people_by_member_id:
+            logging.warning(
+                f"Did not find {sponsor_data['fullName']}, member_id: {member_id} for sponsorship on bill {chamber_bill.base_print_no}"
+            )
+            continue
+
+        person_id, name = people_by_member_id[member_id]
+        sponsorships.append(
+            sponsorship_model(
+                person_id=person_id, is_lead_sponsor=is_lead_sponsor
+            )
         )
+        sponsor_names.append(name)
+
+    chamber_bill.sponsorships.extend(sponsorships)
+    logging.info(
+        f"Added sponsorships for {', '.join(sponsor_names)} to bill {chamber_bill.base_print_no}"
+    )
 
 
 def _extract_alternate_chamber_print_no(chamber_response):
@@ -113,7 +147,9 @@ def import_bill(session_year, base_print_no):
     and track that too.
     """
     initial_chamber_response = senate_get(
-        f"bills/{session_year}/{base_print_no}", view="no_fulltext"
+        f"bills/{session_year}/{base_print_no}",
+        view="no_fulltext",
+        cache_ttl=BILL_CACHE_TTL,
     )
 
     # TODO: Filter out resolutions?
@@ -122,7 +158,7 @@ def import_bill(session_year, base_print_no):
         name=initial_chamber_response["title"],
         description=initial_chamber_response["summary"],
     )
-    bill.state_bill = StateBill(session_year=session_year)
+    bill.state_bill = StateBill(session_year=session_year, synced_at=now())
 
     initial_chamber = initial_chamber_response["billType"]["chamber"]
     same_as_print_no = _extract_alternate_chamber_print_no(
@@ -131,7 +167,9 @@ def import_bill(session_year, base_print_no):
     alternate_chamber_response = None
     if same_as_print_no:
         alternate_chamber_response = senate_get(
-            f"bills/{session_year}/{same_as_print_no}", view="no_fulltext"
+            f"bills/{session_year}/{same_as_print_no}",
+            view="no_fulltext",
+            cache_ttl=BILL_CACHE_TTL,
         )
 
         if {
@@ -218,10 +256,20 @@ def _dedupe_by_district(members_api_items, session_year):
     return output_members
 
 
-def _fill_person_member_data(person, member_data):
-    person.name = member_data["person"]["fullName"]
-    person.title = member_data["person"]["prefix"]
-    person.email = member_data["person"]["email"]
+def _get_member_values_by_id(members_api_items):
+    """Converts members from the API into the column values that
+    upsert_legislators expects, keyed by their member ID."""
+    return {
+        member["memberId"]: (
+            {
+                "name": member["person"]["fullName"],
+                "title": member["person"]["prefix"],
+                "email": member["person"]["email"],
+            },
+            {"district": member["districtCode"]},
+        )
+        for member in members_api_items
+    }
 
 
 @cron_function
@@ -230,77 +278,55 @@ def sync_state_representatives(session_year=CURRENT_SESSION_YEAR):
     in the current session year. If they already exist in the DB, updates
     their contact info."""
 
-    members = senate_get(f"members/{session_year}?limit=1000&full=true")
+    members = senate_get(
+        f"members/{session_year}",
+        limit=1000,
+        full="true",
+        cache_ttl=MEMBERS_CACHE_TTL,
+    )
 
     assembly_member_items = _dedupe_by_district(
         [m for m in members["items"] if m["chamber"] == "ASSEMBLY"],
         session_year,
     )
-    for member in assembly_member_items:
-        member_id = member["memberId"]
-        existing_member = AssemblyMember.query.filter_by(
-            state_member_id=member_id
-        ).one_or_none()
-
-        if existing_member:
-            existing_member.district = member["districtCode"]
-            logging.info(
-                f"Assembly member {existing_member.person.name} already in DB, updating"
-            )
-            person = existing_member.person
-        else:
-            logging.info(
-                f"Adding assembly member {member['person']['fullName']}"
-            )
-            person = Person(type=Person.PersonType.ASSEMBLY_MEMBER)
-            person.assembly_member = AssemblyMember(
-                state_member_id=member_id,
-                district=member["districtCode"],
-            )
-            db.session.add(person)
-
-        _fill_person_member_data(person, member)
+    upsert_legislators(
+        representative_model=AssemblyMember,
+        key_column=AssemblyMember.state_member_id,
+        person_type=Person.PersonType.ASSEMBLY_MEMBER,
+        values_by_key=_get_member_values_by_id(assembly_member_items),
+    )
 
     senate_member_items = _dedupe_by_district(
         [m for m in members["items"] if m["chamber"] == "SENATE"], session_year
     )
-    for member in senate_member_items:
-        member_id = member["memberId"]
-        existing_member = Senator.query.filter_by(
-            state_member_id=member_id
-        ).one_or_none()
-
-        if existing_member:
-            existing_member.district = member["districtCode"]
-            logging.info(
-                f"Senator {existing_member.person.name} already in DB, updating"
-            )
-            person = existing_member.person
-        else:
-            logging.info(f"Adding senator {member['person']['fullName']}")
-            person = Person(type=Person.PersonType.SENATOR)
-            person.senator = Senator(
-                state_member_id=member_id,
-                district=member["districtCode"],
-            )
-            db.session.add(person)
-
-        _fill_person_member_data(person, member)
+    upsert_legislators(
+        representative_model=Senator,
+        key_column=Senator.state_member_id,
+        person_type=Person.PersonType.SENATOR,
+        values_by_key=_get_member_values_by_id(senate_member_items),
+    )
 
     db.session.commit()
 
 
+def _fetch_chamber_bill(session_year_and_print_no):
+    session_year, print_no = session_year_and_print_no
+    # We only get here when the bill may have changed, so always check with
+    # the API. A response that hasn't changed still comes from the cache.
+    return senate_get(
+        f"bills/{session_year}/{print_no}",
+        view="no_fulltext",
+        cache_ttl=timedelta(0),
+    )
+
+
 def _update_state_chamber_bill(
     chamber_bill: Union[SenateBill, AssemblyBill],
+    chamber_response,
     sponsorship_model: Union[SenateSponsorship, AssemblySponsorship],
     representative_model: Union[Senator, AssemblyMember],
     alternate_chamber_bill: Union[SenateBill, AssemblyBill],
 ):
-    chamber_response = senate_get(
-        f"bills/{chamber_bill.state_bill.session_year}/{chamber_bill.base_print_no}",
-        view="no_fulltext",
-    )
-
     alternate_print_no = (
         alternate_chamber_bill.base_print_no
         if alternate_chamber_bill
@@ -334,32 +360,175 @@ def _update_state_chamber_bill(
     )
 
 
+def _format_senate_api_datetime(value: datetime):
+    return (
+        value.astimezone(SENATE_API_TIMEZONE)
+        .replace(tzinfo=None)
+        .isoformat(timespec="seconds")
+    )
+
+
+def get_bills_updated_between(
+    start: datetime, end: datetime
+) -> Set[Tuple[int, str]]:
+    """Returns the (session year, base print number) of every bill that the
+    API processed an update for in the given time range."""
+    path = f"bills/updates/{_format_senate_api_datetime(start)}/{_format_senate_api_datetime(end)}"
+
+    updated_bills = set()
+    offset = 1  # The API's offsets start at 1
+    while True:
+        response = senate_client.get(
+            path, params={"limit": BILL_UPDATES_PAGE_SIZE, "offset": offset}
+        )
+        items = response["result"]["items"]
+        for item in items:
+            updated_bills.add(
+                (item["id"]["session"], item["id"]["basePrintNo"])
+            )
+
+        offset += len(items)
+        if not items or offset > response["total"]:
+            return updated_bills
+
+
+def _get_print_nos(state_bill: StateBill):
+    return [
+        chamber_bill.base_print_no
+        for chamber_bill in (state_bill.senate_bill, state_bill.assembly_bill)
+        if chamber_bill
+    ]
+
+
+def _refresh_state_bill(state_bill: StateBill, chamber_responses, synced_at):
+    """Updates both chambers of a bill from their fetched API responses, and
+    commits them. Failures are rolled back without affecting other bills, and
+    leave the bill's sync time unchanged so that it gets picked up again next
+    time."""
+    keys = [
+        (state_bill.session_year, print_no)
+        for print_no in _get_print_nos(state_bill)
+    ]
+    if not all(key in chamber_responses for key in keys):
+        logging.warning(
+            f"Skipping update of bill {state_bill.bill.code_name} since it could not be fetched"
+        )
+        return
+
+    try:
+        if state_bill.senate_bill:
+            _update_state_chamber_bill(
+                state_bill.senate_bill,
+                chamber_responses[
+                    (
+                        state_bill.session_year,
+                        state_bill.senate_bill.base_print_no,
+                    )
+                ],
+                SenateSponsorship,
+                Senator,
+                state_bill.assembly_bill,
+            )
+        if state_bill.assembly_bill:
+            _update_state_chamber_bill(
+                state_bill.assembly_bill,
+                chamber_responses[
+                    (
+                        state_bill.session_year,
+                        state_bill.assembly_bill.base_print_no,
+                    )
+                ],
+                AssemblySponsorship,
+                AssemblyMember,
+                state_bill.senate_bill,
+            )
+
+        state_bill.synced_at = synced_at
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logging.exception(
+            f"Unhandled exception when updating bill {state_bill.bill.code_name}"
+        )
+
+
 @cron_function
-def update_state_bills():
+def update_state_bills(full_resync=False):
+    """Refreshes the details and sponsorships of all tracked state bills.
+
+    Normally this is incremental. We make one pass over the API's bill updates
+    feed since the last sync, and only refetch the bills that appear in it.
+    Bills that have never been synced, bills that failed to sync last time,
+    or every bill when full_resync is set, are refetched regardless.
+    """
+    synced_at = now()
     state_bills = StateBill.query.all()
+
+    # Every bill that synced in the last run has that run's sync time. One
+    # that failed to refresh keeps an older one, and is refetched directly
+    # rather than holding the updates feed window open for the others.
+    last_synced_at = max(
+        (b.synced_at for b in state_bills if b.synced_at), default=None
+    )
+
+    bills_to_refresh = []
+    synced_bills = []
     for state_bill in state_bills:
-        try:
-            if state_bill.senate_bill:
-                _update_state_chamber_bill(
-                    state_bill.senate_bill,
-                    SenateSponsorship,
-                    Senator,
-                    state_bill.assembly_bill,
-                )
-            if state_bill.assembly_bill:
-                _update_state_chamber_bill(
-                    state_bill.assembly_bill,
-                    AssemblySponsorship,
-                    AssemblyMember,
-                    state_bill.senate_bill,
-                )
+        if (
+            full_resync
+            or state_bill.synced_at is None
+            or state_bill.synced_at < last_synced_at
+        ):
+            bills_to_refresh.append(state_bill)
+        else:
+            synced_bills.append(state_bill)
 
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-            logging.exception(
-                f"Unhandled exception when updating bill {state_bill.bill.code_name}"
-            )
+    unchanged_bill_ids = []
+    if synced_bills:
+        since = last_synced_at - SYNC_OVERLAP
+        updated_bills = get_bills_updated_between(since, synced_at)
+        logging.info(
+            f"Senate API reported {len(updated_bills)} bills updated since {since}"
+        )
+
+        for state_bill in synced_bills:
+            if any(
+                (state_bill.session_year, print_no) in updated_bills
+                for print_no in _get_print_nos(state_bill)
+            ):
+                bills_to_refresh.append(state_bill)
+            else:
+                unchanged_bill_ids.append(state_bill.bill_id)
+
+    logging.info(
+        f"Refreshing {len(bills_to_refresh)} of {len(state_bills)} state bills"
+    )
+    if unchanged_bill_ids:
+        StateBill.query.filter(
+            StateBill.bill_id.in_(unchanged_bill_ids)
+        ).update({StateBill.synced_at: synced_at}, synchronize_session=False)
+        db.session.commit()
+
+    # Download every chamber's data in parallel first, since the time here is
+    # mostly spent waiting on the API. Then write it all on this thread, which
+    # owns the DB session.
+    chamber_responses, fetch_errors = fetch_concurrently(
+        _fetch_chamber_bill,
+        [
+            (state_bill.session_year, print_no)
+            for state_bill in bills_to_refresh
+            for print_no in _get_print_nos(state_bill)
+        ],
+        max_workers=SENATE_API_MAX_CONCURRENCY,
+    )
+    for (session_year, print_no), error in fetch_errors.items():
+        logging.error(
+            f"Could not get bill {session_year}/{print_no} from API",
+            exc_info=error,
+        )
+
+    for state_bill in bills_to_refresh:
+        _refresh_state_bill(state_bill, chamber_responses, synced_at)
 
 
 def _convert_search_results(state_bill):
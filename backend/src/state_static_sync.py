@@ -1,5 +1,8 @@
+from sqlalchemy.orm import joinedload
+
 from .models import db
 from .person.models import AssemblyMember, OfficeContact, Person, Senator
+from .person.sync import reconcile_office_contacts
 from .static_data import assembly_data, senate_data
 from .utils import cron_function
 
@@ -11,10 +14,10 @@ def _fill_person_static_data(assembly_member_or_senator, static_data_set):
     if static_data:
         assembly_member_or_senator.person.party = static_data.get("party")
         assembly_member_or_senator.person.email = static_data.get("email")
-        assembly_member_or_senator.person.office_contacts.clear()
 
+        office_contacts = []
         for office in static_data["district_contact"]:
-            assembly_member_or_senator.person.office_contacts.append(
+            office_contacts.append(
                 OfficeContact(
                     city=office.get("city"),
                     phone=office.get("phone"),
@@ -23,7 +26,7 @@ def _fill_person_static_data(assembly_member_or_senator, static_data_set):
                 )
             )
         for office in static_data["albany_contact"]:
-            assembly_member_or_senator.person.office_contacts.append(
+            office_contacts.append(
                 OfficeContact(
                     city=office.get("city"),
                     phone=office.get("phone"),
@@ -31,17 +34,24 @@ def _fill_person_static_data(assembly_member_or_senator, static_data_set):
                     type=OfficeContact.OfficeContactType.CENTRAL_OFFICE,
                 )
             )
+        reconcile_office_contacts(
+            assembly_member_or_senator.person, office_contacts
+        )
 
 
 @cron_function
 def fill_static_state_data(
     *, senate_data_by_member_id, assembly_data_by_member_id
 ):
-    senators = Senator.query.all()
+    senators = Senator.query.options(
+        joinedload(Senator.person).selectinload(Person.office_contacts)
+    ).all()
     for senator in senators:
         _fill_person_static_data(senator, senate_data_by_member_id)
 
-    assembly_members = AssemblyMember.query.all()
+    assembly_members = AssemblyMember.query.options(
+        joinedload(AssemblyMember.person).selectinload(Person.office_contacts)
+    ).all()
     for assembly_member in assembly_members:
         _fill_person_static_data(assembly_member, assembly_data_by_member_id)
 
@@ -1,8 +1,18 @@
+import enum
 from uuid import uuid4
 
-from sqlalchemy import Boolean, CheckConstraint, Column, ForeignKey, Text, sql
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    Enum,
+    ForeignKey,
+    Text,
+    sql,
+)
 from sqlalchemy.orm import relationship
 
+from ..bill.models import Bill, BillSnapshot
 from ..models import TIMESTAMP, UUID, db
 from ..utils import now
 
@@ -27,6 +37,26 @@ class User(db.Model):
         Boolean, nullable=False, server_default=sql.false(), index=True
     )
 
+    class NotificationFrequency(enum.Enum):
+        # An email after each cron run that changes a bill
+        IMMEDIATE = 1
+        # At most one email a day, covering everything since the last one
+        DAILY_DIGEST = 2
+
+    notification_frequency = Column(
+        Enum(NotificationFrequency),
+        nullable=False,
+        server_default=NotificationFrequency.IMMEDIATE.name,
+    )
+    last_digest_sent_at = Column(TIMESTAMP)
+
+    # If a user has no subscriptions, they're notified about every bill
+    notification_subscriptions = relationship(
+        "NotificationSubscription",
+        back_populates="user",
+        cascade="all, delete",
+    )
+
     __table_args__ = (
         CheckConstraint(
             "email = lower(email)", name="check_email_is_lowercase"
@@ -49,3 +79,33 @@ class LoginLink(db.Model):
 
     # TODO: Consider only allowing these links to be used once. Better security
     # in case of leaked browser URL, but worse UX.
+
+
+class NotificationSubscription(db.Model):
+    """
+    Limits a user's bill update emails to a bill, a chamber, or one chamber of
+    a bill. Users get updates matching any of their subscriptions."""
+
+    __tablename__ = "notification_subscriptions"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+
+    user_id = Column(UUID, ForeignKey(User.id), nullable=False, index=True)
+    user = relationship(User, back_populates="notification_subscriptions")
+
+    # Either of these can be empty to match all bills or all chambers
+    bill_id = Column(UUID, ForeignKey(Bill.id))
+    bill = relationship(Bill, back_populates="notification_subscriptions")
+    chamber = Column(Enum(BillSnapshot.Chamber))
+
+    __table_args__ = (
+        CheckConstraint(
+            "bill_id IS NOT NULL OR chamber IS NOT NULL",
+            name="check_subscription_is_not_empty",
+        ),
+    )
+
+    def matches(self, bill_id, chamber: BillSnapshot.Chamber):
+        return (self.bill_id is None or self.bill_id == bill_id) and (
+            self.chamber is None or self.chamber == chamber
+        )
@@ -1,6 +1,14 @@
 from marshmallow import fields
+from marshmallow_enum import EnumField
 
+from ..bill.models import BillSnapshot
 from ..schema import CamelCaseSchema
+from .models import User
+
+
+class NotificationSubscriptionSchema(CamelCaseSchema):
+    bill_id = fields.UUID(allow_none=True)
+    chamber = EnumField(BillSnapshot.Chamber, allow_none=True)
 
 
 class UserSchema(CamelCaseSchema):
@@ -11,6 +19,10 @@ class UserSchema(CamelCaseSchema):
     name = fields.String()
     can_be_deleted = fields.Boolean(dump_only=True)
     send_bill_update_notifications = fields.Boolean()
+    notification_frequency = EnumField(User.NotificationFrequency)
+    notification_subscriptions = fields.List(
+        fields.Nested(NotificationSubscriptionSchema)
+    )
 
 
 class CreateLoginLinkSchema(CamelCaseSchema):
@@ -2,17 +2,19 @@ import secrets
 from datetime import timedelta
 
 import flask
-from flask import jsonify, request
+from flask import jsonify, render_template, request
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from werkzeug import exceptions
 
 from ..app import app
 from ..auth import auth_required, create_jwt
+from ..bill.models import Bill
+from ..email_outbox.outbox import QueuedEmail, enqueue_email
 from ..models import db
-from ..ses import send_login_link_email
 from ..settings import APP_ORIGIN
 from ..utils import now
-from .models import LoginLink, User
+from .models import LoginLink, NotificationSubscription, User
 from .schema import CreateLoginLinkSchema, LoginSchema, UserSchema
 
 
@@ -34,11 +36,22 @@ def create_login_link():
         token=secrets.token_urlsafe(),
     )
     db.session.add(login)
-    db.session.commit()
 
-    send_login_link_email(
-        email_lower, f"{APP_ORIGIN}/login?token={login.token}"
+    login_link = f"{APP_ORIGIN}/login?token={login.token}"
+    enqueue_email(
+        QueuedEmail(
+            idempotency_key=f"login-link:{login.token}",
+            to_address=email_lower,
+            subject="Log in to 350 Bill Tracker",
+            body_html=render_template(
+                "login_email.html", login_link=login_link
+            ),
+            body_text=render_template(
+                "login_email.txt", login_link=login_link
+            ),
+        )
     )
+    db.session.commit()
 
     return jsonify({})
 
@@ -69,7 +82,9 @@ def login():
 )
 @auth_required
 def list_users():
-    users = User.query.all()
+    users = User.query.options(
+        selectinload(User.notification_subscriptions)
+    ).all()
 
     return UserSchema(many=True).jsonify(users)
 
@@ -132,6 +147,43 @@ def update_current_user():
     current_user.send_bill_update_notifications = data[
         "send_bill_update_notifications"
     ]
+    if (
+        "notification_frequency" in data
+        and data["notification_frequency"]
+        != current_user.notification_frequency
+    ):
+        current_user.notification_frequency = data["notification_frequency"]
+        if (
+            current_user.notification_frequency
+            == User.NotificationFrequency.DAILY_DIGEST
+        ):
+            # So their first digest goes out on schedule with everyone else's
+            current_user.last_digest_sent_at = now()
+    if "notification_subscriptions" in data:
+        subscriptions = data["notification_subscriptions"]
+        if not all(
+            s.get("bill_id") or s.get("chamber") for s in subscriptions
+        ):
+            raise exceptions.UnprocessableEntity(
+                "subscriptions need a bill or a chamber"
+            )
+
+        bill_ids = {s["bill_id"] for s in subscriptions if s.get("bill_id")}
+        existing_bill_ids = {
+            bill_id
+            for (bill_id,) in db.session.query(Bill.id).filter(
+                Bill.id.in_(bill_ids)
+            )
+        }
+        missing_bill_ids = bill_ids - existing_bill_ids
+        if missing_bill_ids:
+            raise exceptions.UnprocessableEntity(
+                f"bills not found: {', '.join(sorted(str(id) for id in missing_bill_ids))}"
+            )
+        current_user.notification_subscriptions = [
+            NotificationSubscription(**subscription)
+            for subscription in data["notification_subscriptions"]
+        ]
     db.session.commit()
 
     return jsonify({})
@@ -1,5 +1,8 @@
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from time import monotonic, sleep
 
 from src.models import db
 
@@ -20,3 +23,52 @@ def cron_function(func):
             logging.exception("Exception thrown during cron function")
 
     return impl
+
+
+class RateLimiter:
+    """Spaces out calls so that at most max_per_second of them start in any
+    second. Can be shared between threads."""
+
+    def __init__(self, max_per_second=None):
+        self.interval = 1 / max_per_second if max_per_second else 0
+        self._lock = threading.Lock()
+        self._next_start = 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            current = monotonic()
+            start = max(self._next_start, current)
+            self._next_start = start + self.interval
+        if start > current:
+            sleep(start - current)
+
+
+def fetch_concurrently(fetch, items, *, max_workers, max_per_second=None):
+    """Calls fetch(item) for each item on a bounded pool of threads, optionally
+    rate limited, and returns two dicts keyed by item: the results, and the
+    exceptions for any fetches that failed. A failure for one item doesn't
+    affect the others.
+
+    The fetch function runs off the main thread, so it must not touch the DB
+    session. Apply the results afterwards instead."""
+    rate_limiter = RateLimiter(max_per_second)
+
+    def rate_limited_fetch(item):
+        rate_limiter.wait()
+        return fetch(item)
+
+    results = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            item: executor.submit(rate_limited_fetch, item) for item in items
+        }
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                errors[item] = e
+
+    return results, errors
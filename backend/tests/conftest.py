@@ -1,8 +1,9 @@
 from uuid import UUID, uuid4
 
 import pytest
+from botocore.exceptions import ClientError
 
-from src import app, models
+from src import app, google_sheets, models, state_api
 from src.bill.models import (
     AssemblyBill,
     Bill,
@@ -29,12 +30,38 @@ from .utils import ApiClient
 def autouse_fixtures():
     models.db.drop_all()
     models.db.create_all()
+    state_api.senate_client.cache.clear()
+    google_sheets.clear_google_services()
 
     yield
 
     models.db.session.close()
 
 
+class StubSesClient:
+    """Records sent emails, and fails for the addresses it's told to."""
+
+    def __init__(self, error_codes_by_email):
+        self.error_codes_by_email = error_codes_by_email
+        self.sent_to = []
+
+    def send_email(self, *, Destination, Message, Source):
+        [email] = Destination["ToAddresses"]
+        if email in self.error_codes_by_email:
+            raise ClientError(
+                {"Error": {"Code": self.error_codes_by_email[email]}},
+                "SendEmail",
+            )
+
+        self.sent_to.append(email)
+        return {"MessageId": f"message-{email}"}
+
+
+@pytest.fixture
+def stub_ses_client():
+    return StubSesClient({})
+
+
 # TODO: Do we want this?
 # @pytest.fixture(autouse=True)
 # def request_context(app):
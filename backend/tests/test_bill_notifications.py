@@ -1,10 +1,20 @@
+from datetime import datetime
 from unittest.mock import patch
 from uuid import uuid4
 
 import responses
+from freezegun import freeze_time
+from sqlalchemy import event
 
 from src.app import app
-from src.bill.models import AssemblyBill, Bill, CityBill, SenateBill, StateBill
+from src.bill.models import (
+    AssemblyBill,
+    Bill,
+    BillSnapshot,
+    CityBill,
+    SenateBill,
+    StateBill,
+)
 from src.bill_notifications import (
     BillDiffSet,
     GenericBillDiff,
@@ -13,9 +23,15 @@ from src.bill_notifications import (
     StateBillDiff,
     StateBillSnapshot,
     _calculate_all_bill_diffs,
+    _fill_sponsor_names,
+    _filter_bill_diffs,
     _render_email_contents,
+    _save_snapshots,
     send_bill_update_notifications,
+    snapshot_bills,
 )
+from src.email_outbox.models import OutboundEmail
+from src.email_outbox.outbox import drain_outbox
 from src.models import db
 from src.person.models import AssemblyMember, CouncilMember, Person, Senator
 from src.sponsorship.models import (
@@ -23,7 +39,7 @@ from src.sponsorship.models import (
     CitySponsorship,
     SenateSponsorship,
 )
-from src.user.models import User
+from src.user.models import NotificationSubscription, User
 from src.utils import now
 
 
@@ -91,6 +107,34 @@ def add_test_sponsorship(*, bill, person):
     return impl()
 
 
+def test_snapshot_bills(state_bill, senator):
+    city_bill = add_test_city_bill(1, "Enacted")
+    council_member = add_test_council_member(1)
+    add_test_sponsorship(bill=city_bill, person=council_member)
+    senator.senator.sponsorships.append(
+        SenateSponsorship(bill_id=state_bill.id, is_lead_sponsor=True)
+    )
+    db.session.commit()
+
+    assert snapshot_bills() == SnapshotState(
+        city_snapshots={
+            city_bill.id: GenericBillSnapshot(
+                status="Enacted", sponsor_person_ids={council_member.id}
+            )
+        },
+        state_snapshots={
+            state_bill.id: StateBillSnapshot(
+                senate_snapshot=GenericBillSnapshot(
+                    status="Committee", sponsor_person_ids={senator.id}
+                ),
+                assembly_snapshot=GenericBillSnapshot(
+                    status="Voted", sponsor_person_ids=set()
+                ),
+            )
+        },
+    )
+
+
 def test_calculate_all_bill_diffs__city():
     bill_1 = add_test_city_bill(1, "Enacted")
     bill_2 = add_test_city_bill(2, "Enacted")
@@ -127,6 +171,46 @@ def test_calculate_all_bill_diffs__city():
     assert diff.new_status == "Enacted"
 
 
+def test_fill_sponsor_names__one_query_for_every_diff():
+    member_1 = add_test_council_member(1)
+    member_2 = add_test_council_member(2)
+    member_3 = add_test_council_member(3)
+    db.session.commit()
+    # Never stored, so it has no name to show
+    unknown_id = uuid4()
+
+    diffs = [
+        GenericBillDiff(
+            added_sponsor_ids={member_3.id, member_1.id},
+            removed_sponsor_ids={member_2.id, unknown_id},
+        ),
+        GenericBillDiff(
+            added_sponsor_ids={member_2.id}, removed_sponsor_ids=set()
+        ),
+        GenericBillDiff(added_sponsor_ids=set(), removed_sponsor_ids=set()),
+    ]
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        _fill_sponsor_names(diffs)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    assert len(statements) == 1
+    assert [
+        (d.added_sponsor_names, d.removed_sponsor_names) for d in diffs
+    ] == [
+        (["1 name", "3 name"], ["2 name"]),
+        (["2 name"], []),
+        ([], []),
+    ]
+
+
 def test_calculate_all_bill_diffs__state_senate(get_uuid, senator):
     bill = Bill(
         id=get_uuid(),
@@ -510,8 +594,6 @@ def test_send_email_notification_end_to_end(
     )
     db.session.add(other_user)
 
-    db.session.commit()
-
     snapshot_state = SnapshotState(
         city_snapshots={
             city_bill.id: GenericBillSnapshot(
@@ -542,7 +624,257 @@ def test_send_email_notification_end_to_end(
 
     mock_ses_client.send_email.side_effect = side_effect
 
+    _save_snapshots(snapshot_state)
+    db.session.commit()
+
+    with app.app_context():
+        send_bill_update_notifications()
+    drain_outbox()
+
+    mock_ses_client.send_email.assert_called_once()
+
+    # The new state was stored, so there's nothing to send the second time
     with app.app_context():
-        send_bill_update_notifications(snapshot_state)
+        send_bill_update_notifications()
+    drain_outbox()
 
     mock_ses_client.send_email.assert_called_once()
+
+
+@patch("src.ses.client")
+def test_send_email_notification__new_bills_are_only_stored(
+    mock_ses_client, city_bill, state_bill
+):
+    db.session.add(
+        User(
+            id=uuid4(),
+            name="User to notify",
+            email="user@example.com",
+            send_bill_update_notifications=True,
+        )
+    )
+    db.session.commit()
+
+    with app.app_context():
+        send_bill_update_notifications()
+    drain_outbox()
+
+    mock_ses_client.send_email.assert_not_called()
+    assert BillSnapshot.query.count() == 3
+
+
+def make_test_diff(bill_id, bill_number):
+    return GenericBillDiff(
+        old_status="Committee",
+        new_status="Enacted",
+        added_sponsor_names=[],
+        removed_sponsor_names=[],
+        current_sponsor_count=0,
+        bill_id=bill_id,
+        bill_number=bill_number,
+        bill_name="Test bill",
+    )
+
+
+def test_filter_bill_diffs():
+    city_bill_id = uuid4()
+    state_bill_id = uuid4()
+    city_diff = make_test_diff(city_bill_id, "Intro 1")
+    senate_diff = make_test_diff(state_bill_id, "S1")
+    assembly_diff = make_test_diff(state_bill_id, "A1")
+    bill_diffs = BillDiffSet(
+        city_diffs=[city_diff],
+        state_diffs=[
+            StateBillDiff(senate_diff=senate_diff, assembly_diff=assembly_diff)
+        ],
+    )
+
+    assert _filter_bill_diffs(bill_diffs, []) == bill_diffs
+
+    assert (
+        _filter_bill_diffs(
+            bill_diffs,
+            [NotificationSubscription(chamber=BillSnapshot.Chamber.CITY)],
+        )
+        == BillDiffSet(city_diffs=[city_diff], state_diffs=[])
+    )
+
+    assert _filter_bill_diffs(
+        bill_diffs, [NotificationSubscription(bill_id=state_bill_id)]
+    ) == BillDiffSet(
+        city_diffs=[],
+        state_diffs=[
+            StateBillDiff(senate_diff=senate_diff, assembly_diff=assembly_diff)
+        ],
+    )
+
+    assert _filter_bill_diffs(
+        bill_diffs,
+        [
+            NotificationSubscription(
+                bill_id=state_bill_id, chamber=BillSnapshot.Chamber.ASSEMBLY
+            )
+        ],
+    ) == BillDiffSet(
+        city_diffs=[],
+        state_diffs=[
+            StateBillDiff(senate_diff=None, assembly_diff=assembly_diff)
+        ],
+    )
+
+
+def make_changed_snapshot_state(city_bill, state_bill):
+    return SnapshotState(
+        city_snapshots={
+            city_bill.id: GenericBillSnapshot(
+                "Not introduced", sponsor_person_ids=set()
+            ),
+        },
+        state_snapshots={
+            state_bill.id: StateBillSnapshot(
+                senate_snapshot=GenericBillSnapshot(
+                    "Introduced in senate", sponsor_person_ids=set()
+                ),
+                assembly_snapshot=GenericBillSnapshot(
+                    "Introduced in assembly", sponsor_person_ids=set()
+                ),
+            )
+        },
+    )
+
+
+def add_test_user(email, subscriptions=(), **kwargs):
+    user = User(
+        id=uuid4(),
+        name=email,
+        email=email,
+        send_bill_update_notifications=True,
+        notification_subscriptions=list(subscriptions),
+        **kwargs,
+    )
+    db.session.add(user)
+    return user
+
+
+def test_send_email_notification__filtered_by_subscriptions(
+    city_bill, state_bill
+):
+    add_test_user("everything@example.com")
+    add_test_user(
+        "city-1@example.com",
+        [NotificationSubscription(chamber=BillSnapshot.Chamber.CITY)],
+    )
+    add_test_user(
+        "city-2@example.com",
+        [NotificationSubscription(bill_id=city_bill.id)],
+    )
+    add_test_user(
+        "unrelated@example.com",
+        [
+            NotificationSubscription(
+                bill_id=city_bill.id, chamber=BillSnapshot.Chamber.SENATE
+            )
+        ],
+    )
+    _save_snapshots(make_changed_snapshot_state(city_bill, state_bill))
+    db.session.commit()
+
+    with patch(
+        "src.bill_notifications._render_email_contents",
+        wraps=_render_email_contents,
+    ) as mock_render:
+        with app.app_context():
+            send_bill_update_notifications()
+
+    # Both city subscribers get the same email, which is only rendered once
+    assert mock_render.call_count == 2
+    emails_by_address = {
+        email.to_address: email for email in OutboundEmail.query
+    }
+    assert emails_by_address.keys() == {
+        "everything@example.com",
+        "city-1@example.com",
+        "city-2@example.com",
+    }
+    assert (
+        emails_by_address["city-1@example.com"].body_html
+        == emails_by_address["city-2@example.com"].body_html
+    )
+    assert (
+        emails_by_address["city-1@example.com"].body_html
+        != emails_by_address["everything@example.com"].body_html
+    )
+
+
+def test_send_email_notification__daily_digest(city_bill, state_bill):
+    add_test_user(
+        "digest@example.com",
+        notification_frequency=User.NotificationFrequency.DAILY_DIGEST,
+        last_digest_sent_at=datetime.fromisoformat(
+            "2021-05-31T08:00:00-04:00"
+        ),
+    )
+    _save_snapshots(
+        make_changed_snapshot_state(city_bill, state_bill), is_digest=True
+    )
+    db.session.commit()
+
+    # Before the digest goes out, changes only update the immediate snapshots
+    with freeze_time(datetime.fromisoformat("2021-06-01T07:00:00-04:00")):
+        with app.app_context():
+            send_bill_update_notifications()
+    assert OutboundEmail.query.count() == 0
+
+    with freeze_time(datetime.fromisoformat("2021-06-01T08:30:00-04:00")):
+        with app.app_context():
+            send_bill_update_notifications()
+    email = OutboundEmail.query.one()
+    assert email.to_address == "digest@example.com"
+    assert email.subject.startswith("Daily digest: ")
+    digest_user = User.query.filter_by(email="digest@example.com").one()
+    assert digest_user.last_digest_sent_at == datetime.fromisoformat(
+        "2021-06-01T08:30:00-04:00"
+    )
+
+    # There's only one digest a day
+    CityBill.query.one().status = "Committee"
+    db.session.commit()
+    with freeze_time(datetime.fromisoformat("2021-06-01T12:00:00-04:00")):
+        with app.app_context():
+            send_bill_update_notifications()
+    assert OutboundEmail.query.count() == 1
+
+    with freeze_time(datetime.fromisoformat("2021-06-02T08:00:00-04:00")):
+        with app.app_context():
+            send_bill_update_notifications()
+    assert OutboundEmail.query.count() == 2
+
+
+def test_send_email_notification__digest_waits_for_every_user(
+    city_bill, state_bill
+):
+    add_test_user(
+        "up-to-date@example.com",
+        notification_frequency=User.NotificationFrequency.DAILY_DIGEST,
+        last_digest_sent_at=datetime.fromisoformat(
+            "2021-06-01T08:30:00-04:00"
+        ),
+    )
+    add_test_user(
+        "new@example.com",
+        notification_frequency=User.NotificationFrequency.DAILY_DIGEST,
+    )
+    _save_snapshots(
+        make_changed_snapshot_state(city_bill, state_bill), is_digest=True
+    )
+    db.session.commit()
+
+    with freeze_time(datetime.fromisoformat("2021-06-01T10:00:00-04:00")):
+        with app.app_context():
+            send_bill_update_notifications()
+
+    assert OutboundEmail.query.count() == 0
+    user = User.query.filter_by(email="up-to-date@example.com").one()
+    assert user.last_digest_sent_at == datetime.fromisoformat(
+        "2021-06-01T08:30:00-04:00"
+    )
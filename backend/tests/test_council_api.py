@@ -0,0 +1,58 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import responses
+
+from src.council_api import chunk_or_filters, lookup_bills_by_ids
+
+
+def test_chunk_or_filters():
+    filters = ["MatterId eq 1", "MatterId eq 2", "MatterId eq 3"]
+
+    assert list(chunk_or_filters(filters, max_length=100)) == [
+        "MatterId eq 1 or MatterId eq 2 or MatterId eq 3"
+    ]
+    assert list(chunk_or_filters(filters, max_length=30)) == [
+        "MatterId eq 1 or MatterId eq 2",
+        "MatterId eq 3",
+    ]
+    assert list(chunk_or_filters([], max_length=30)) == []
+
+
+def make_matter(matter_id):
+    return {
+        "MatterId": matter_id,
+        "MatterFile": f"Int {matter_id}",
+        "MatterName": f"Bill {matter_id}",
+        "MatterTitle": "Title",
+        "MatterBodyName": "Committee",
+        "MatterIntroDate": "2021-01-01T00:00:00",
+        "MatterStatusName": "Committee",
+        "MatterVersion": "A",
+    }
+
+
+@responses.activate
+def test_lookup_bills_by_ids():
+    matter_ids = list(range(1000, 1200))
+
+    def callback(request):
+        filter = parse_qs(urlparse(request.url).query)["$filter"][0]
+        ids = [int(term.split(" eq ")[1]) for term in filter.split(" or ")]
+        # Leave one out to check that missing bills are skipped
+        matters = [make_matter(id) for id in ids if id != 1100]
+        return (200, {}, json.dumps(matters))
+
+    responses.add_callback(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters",
+        callback=callback,
+    )
+
+    bills_by_id = lookup_bills_by_ids(matter_ids)
+
+    assert 1 < len(responses.calls) < 10
+    for call in responses.calls:
+        assert len(call.request.url) < 2000
+    assert set(bills_by_id.keys()) == set(matter_ids) - {1100}
+    assert bills_by_id[1001]["city_bill"]["file"] == "Int 1001"
@@ -4,7 +4,7 @@ from uuid import uuid4
 import responses
 from freezegun import freeze_time
 
-from src.bill.models import Bill
+from src.bill.models import Bill, CityBill
 from src.council_sync import (
     add_council_members,
     fill_council_person_data_from_api,
@@ -16,6 +16,7 @@ from src.models import db
 from src.person.models import CouncilMember, OfficeContact, Person
 from src.sponsorship.models import CitySponsorship
 from src.static_data.council_data import COUNCIL_DATA_BY_LEGISLATOR_ID
+from src.utils import now
 
 
 @responses.activate
@@ -153,17 +154,25 @@ def test_fill_council_person_static_data():
 def test_sync_bill_updates(city_bill):
     responses.add(
         responses.GET,
-        url="https://webapi.legistar.com/v1/nyc/matters/1?token=fake_token",
-        json={
-            "MatterId": city_bill.city_bill.city_bill_id,
-            "MatterFile": "New file",
-            "MatterName": "New name",
-            "MatterTitle": "New title",
-            "MatterBodyName": "New body",
-            "MatterIntroDate": "2021-01-01T00:00:00",
-            "MatterStatusName": "New status",
-            "MatterVersion": "New version",
-        },
+        url="https://webapi.legistar.com/v1/nyc/matters?token=fake_token&%24filter=MatterId+eq+1",
+        json=[
+            {
+                "MatterId": city_bill.city_bill.city_bill_id,
+                "MatterFile": "New file",
+                "MatterName": "New name",
+                "MatterTitle": "New title",
+                "MatterBodyName": "New body",
+                "MatterIntroDate": "2021-01-01T00:00:00",
+                "MatterStatusName": "New status",
+                "MatterVersion": "New version",
+            }
+        ],
+    )
+
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters/1/sponsors?token=fake_token",
+        json=[],
     )
 
     sync_bill_updates()
@@ -181,6 +190,150 @@ def test_sync_bill_updates(city_bill):
     assert result.city_bill.active_version == "New version"
 
 
+def make_matter(city_bill_id, last_modified, name="New name"):
+    return {
+        "MatterId": city_bill_id,
+        "MatterFile": "New file",
+        "MatterName": name,
+        "MatterTitle": "New title",
+        "MatterBodyName": "New body",
+        "MatterIntroDate": "2021-01-01T00:00:00",
+        "MatterStatusName": "New status",
+        "MatterVersion": "A",
+        "MatterLastModifiedUtc": last_modified,
+    }
+
+
+@responses.activate
+@freeze_time("2021-10-12")
+def test_sync_bill_updates__incremental():
+    synced_at = datetime(2021, 10, 11, tzinfo=timezone.utc)
+    last_modified_at = datetime(2021, 10, 1, tzinfo=timezone.utc)
+    bills = []
+    for city_bill_id in [1, 2, 3]:
+        bill = Bill(
+            id=uuid4(),
+            name=f"Old name {city_bill_id}",
+            description="description",
+            type=Bill.BillType.CITY,
+        )
+        bill.city_bill = CityBill(
+            city_bill_id=city_bill_id,
+            file="file",
+            intro_date=now(),
+            status="Committee",
+            active_version="A",
+            last_modified_at=last_modified_at,
+            synced_at=synced_at,
+        )
+        db.session.add(bill)
+        bills.append(bill)
+    db.session.commit()
+
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters",
+        json=[
+            # Modified, and should be refreshed
+            make_matter(1, "2021-10-11T12:30:00.47"),
+            # Reported since it's in the overlap window, but not actually newer
+            make_matter(2, "2021-10-01T00:00:00"),
+            # Not a bill we track
+            make_matter(500, "2021-10-11T12:30:00"),
+        ],
+    )
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters/1/sponsors?token=fake_token",
+        json=[],
+    )
+
+    sync_bill_updates()
+
+    assert len(responses.calls) == 2
+    assert (
+        "MatterLastModifiedUtc+ge+datetime%272021-10-10T23%3A45%3A00%27"
+        in responses.calls[0].request.url
+    )
+
+    refreshed, unchanged, not_reported = [
+        Bill.query.get(bill.id) for bill in bills
+    ]
+    assert refreshed.name == "New name"
+    assert refreshed.city_bill.last_modified_at == datetime(
+        2021, 10, 11, 12, 30, 0, 470000, tzinfo=timezone.utc
+    )
+    assert unchanged.name == "Old name 2"
+    assert not_reported.name == "Old name 3"
+    for bill in [refreshed, unchanged, not_reported]:
+        assert bill.city_bill.synced_at == datetime(
+            2021, 10, 12, tzinfo=timezone.utc
+        )
+
+
+@responses.activate
+@freeze_time("2021-10-12")
+def test_sync_bill_updates__failed_bill_doesnt_hold_window_open():
+    last_modified_at = datetime(2021, 10, 1, tzinfo=timezone.utc)
+    bills = []
+    for city_bill_id, synced_at in [
+        (1, datetime(2021, 10, 11, tzinfo=timezone.utc)),
+        # Failed to refresh in every run since this
+        (2, datetime(2021, 9, 1, tzinfo=timezone.utc)),
+    ]:
+        bill = Bill(
+            id=uuid4(),
+            name=f"Old name {city_bill_id}",
+            description="description",
+            type=Bill.BillType.CITY,
+        )
+        bill.city_bill = CityBill(
+            city_bill_id=city_bill_id,
+            file="file",
+            intro_date=now(),
+            status="Committee",
+            active_version="A",
+            last_modified_at=last_modified_at,
+            synced_at=synced_at,
+        )
+        db.session.add(bill)
+        bills.append(bill)
+    db.session.commit()
+
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters?token=fake_token&%24filter=MatterId+eq+2",
+        json=[make_matter(2, "2021-09-15T00:00:00")],
+    )
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters",
+        json=[],
+    )
+    responses.add(
+        responses.GET,
+        url="https://webapi.legistar.com/v1/nyc/matters/2/sponsors?token=fake_token",
+        json=[],
+    )
+
+    sync_bill_updates()
+
+    [modified_since_call] = [
+        c for c in responses.calls if "MatterLastModifiedUtc" in c.request.url
+    ]
+    assert (
+        "MatterLastModifiedUtc+ge+datetime%272021-10-10T23%3A45%3A00%27"
+        in modified_since_call.request.url
+    )
+    unchanged, retried = [Bill.query.get(bill.id) for bill in bills]
+    assert unchanged.name == "Old name 1"
+    assert retried.name == "New name"
+    for bill in [unchanged, retried]:
+        assert bill.city_bill.synced_at == datetime(
+            2021, 10, 12, tzinfo=timezone.utc
+        )
+
+
 @responses.activate
 @freeze_time("2021-1-1")
 def test_update_sponsorships__new_sponsor(city_bill):
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from src.email_outbox.models import OutboundEmail
+from src.email_outbox.outbox import (
+    MAX_ATTEMPTS,
+    QueuedEmail,
+    drain_outbox,
+    enqueue_emails,
+)
+from src.models import db
+from src.utils import now
+
+
+def queue_email(email, key=None):
+    enqueue_emails(
+        [
+            QueuedEmail(
+                idempotency_key=key or email,
+                to_address=email,
+                subject="Subject",
+                body_html="<p>Body</p>",
+                body_text="Body",
+            )
+        ]
+    )
+    db.session.commit()
+
+
+@patch("src.email_outbox.outbox.SES_MAX_SEND_RATE", None)
+def test_drain_outbox(stub_ses_client):
+    for email in [
+        "a@example.com",
+        "throttled@example.com",
+        "b@example.com",
+        "rejected@example.com",
+    ]:
+        queue_email(email)
+    ses_client = stub_ses_client
+    ses_client.error_codes_by_email = {
+        "throttled@example.com": "Throttling",
+        "rejected@example.com": "MessageRejected",
+    }
+
+    report = drain_outbox(ses_client=ses_client, batch_size=3)
+
+    assert sorted(ses_client.sent_to) == ["a@example.com", "b@example.com"]
+    assert (report.sent, report.failed, report.throttled) == (2, 1, 1)
+
+    sent = OutboundEmail.query.filter_by(to_address="a@example.com").one()
+    assert sent.status == OutboundEmail.Status.SENT
+    assert sent.message_id == "message-a@example.com"
+
+    throttled = OutboundEmail.query.filter_by(
+        to_address="throttled@example.com"
+    ).one()
+    assert throttled.status == OutboundEmail.Status.PENDING
+    # Being throttled doesn't count as an attempt
+    assert throttled.attempts == 0
+    assert throttled.next_attempt_at > now()
+
+    # Nothing is due again until the retry delay passes
+    assert drain_outbox(ses_client=ses_client).sent == 0
+
+    ses_client.error_codes_by_email = {}
+    with freeze_time(now() + timedelta(minutes=5)):
+        report = drain_outbox(ses_client=ses_client)
+
+    assert report.sent == 2
+    assert (
+        OutboundEmail.query.filter_by(status=OutboundEmail.Status.SENT).count()
+        == 4
+    )
+
+
+def test_drain_outbox__gives_up_after_max_attempts(stub_ses_client):
+    queue_email("rejected@example.com")
+    email = OutboundEmail.query.one()
+    email.attempts = MAX_ATTEMPTS - 1
+    db.session.commit()
+
+    stub_ses_client.error_codes_by_email = {"rejected@example.com": "Error"}
+    drain_outbox(ses_client=stub_ses_client)
+
+    assert email.status == OutboundEmail.Status.FAILED
+    assert email.last_error
+
+
+def test_drain_outbox__throttling_never_gives_up(stub_ses_client):
+    queue_email("throttled@example.com")
+    email = OutboundEmail.query.one()
+    email.attempts = MAX_ATTEMPTS - 1
+    db.session.commit()
+
+    stub_ses_client.error_codes_by_email = {
+        "throttled@example.com": "Throttling"
+    }
+    drain_outbox(ses_client=stub_ses_client)
+
+    assert email.status == OutboundEmail.Status.PENDING
+    assert email.attempts == MAX_ATTEMPTS - 1
+
+
+@patch("src.email_outbox.outbox.SES_MAX_SEND_RATE", 4)
+@patch("src.utils.sleep")
+@patch("src.utils.monotonic", return_value=100)
+def test_drain_outbox__respects_rate_limit(
+    mock_monotonic, mock_sleep, stub_ses_client
+):
+    for email in ["a@example.com", "b@example.com", "c@example.com"]:
+        queue_email(email)
+
+    assert drain_outbox(ses_client=stub_ses_client).sent == 3
+
+    assert sorted(c.args[0] for c in mock_sleep.call_args_list) == [
+        0.25,
+        0.5,
+    ]
+
+
+def test_enqueue_emails__skips_duplicate_keys():
+    queue_email("a@example.com", key="same-key")
+    queue_email("b@example.com", key="same-key")
+
+    assert OutboundEmail.query.one().to_address == "a@example.com"
@@ -1,13 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
+from sqlalchemy import event
+
+from src import google_sheets
 from src.google_sheets import (
     _extract_data_from_previous_spreadsheet,
+    _get_drive_service,
+    _get_raw_cell_data,
+    _get_sheets_service,
     create_power_hour,
 )
 from src.models import db
-from src.person.models import CouncilMember, OfficeContact, Person
-from src.sponsorship.models import CitySponsorship
+from src.person.models import CouncilMember, OfficeContact, Person, Staffer
+from src.sponsorship.models import CitySponsorship, SenateSponsorship
 
 
 @patch("src.google_sheets.Credentials")
@@ -19,7 +27,7 @@ def test_generate_google_sheet__no_import(
     mock_drive_service = MagicMock()
 
     # TODO: Figure out how to reuse this as a fixture
-    def side_effect(service, version, credentials=None):
+    def side_effect(service, version, **kwargs):
         if service == "sheets":
             return mock_sheets_service
         if service == "drive":
@@ -73,6 +81,21 @@ def test_generate_google_sheet__no_import(
     mock_sheets_service.spreadsheets().create.assert_called_with(body=snapshot)
     mock_sheets_service.spreadsheets().create().execute.assert_called()
 
+    # Formatting is applied to ranges once the sheet exists
+    mock_sheets_service.spreadsheets().batchUpdate.assert_called_once_with(
+        spreadsheetId="test_spreadsheet", body=snapshot
+    )
+    requests = mock_sheets_service.spreadsheets().batchUpdate.call_args.kwargs[
+        "body"
+    ]["requests"]
+    bold_rows = [
+        r["repeatCell"]["range"]["startRowIndex"]
+        for r in requests
+        if "bold" in r.get("repeatCell", {}).get("fields", "")
+    ]
+    # The column titles, NON-SPONSORS and SPONSORS
+    assert bold_rows == [0, 1, 4]
+
     mock_drive_service.permissions().create.assert_called_with(
         fileId="test_spreadsheet",
         fields="id",
@@ -89,7 +112,7 @@ def test_generate_google_sheet__with_import(
     mock_drive_service = MagicMock()
 
     # TODO: Share this setup in a fixture
-    def side_effect(service, version, credentials=None):
+    def side_effect(service, version, **kwargs):
         if service == "sheets":
             return mock_sheets_service
         if service == "drive":
@@ -158,12 +181,22 @@ def test_generate_google_sheet__with_import(
         "Spreadsheet was created",
     ]
 
+    mock_sheets_service.spreadsheets().get.assert_called_with(
+        spreadsheetId="123",
+        includeGridData=True,
+        fields="sheets(properties(title),data(rowData(values(formattedValue))))",
+    )
+
     # TODO: Assert on the contents of the body that's passed in, not just the snapshot.
     # Needs a matcher.
     mock_sheets_service.spreadsheets().create.assert_called_with(body=snapshot)
     mock_sheets_service.spreadsheets().create().execute.assert_called()
 
 
+def test_get_raw_cell_data__empty_sheet():
+    assert _get_raw_cell_data({"data": [{}]}) == []
+
+
 def test_extract_data_from_previous_spreadsheet():
     corey = Person(
         name="Corey D. Johnson", type=Person.PersonType.COUNCIL_MEMBER
@@ -189,7 +222,9 @@ def test_extract_data_from_previous_spreadsheet():
         ["Bread Lender", "bread@council.ny.gov", "Put a typo in Brad's name"],
     ]
 
-    result = _extract_data_from_previous_spreadsheet(cell_data)
+    result = _extract_data_from_previous_spreadsheet(
+        cell_data, CouncilMember.query.all()
+    )
 
     assert result.extra_column_titles == ["Summary of action"]
     assert len(result.column_data_by_legislator_id) == 2
@@ -220,9 +255,197 @@ def test_extract_data_from_previous_spreadsheet_no_name():
         ["Corey D. Johnson", "cojo@council.ny.gov", "Left a voicemail"],
     ]
 
-    result = _extract_data_from_previous_spreadsheet(cell_data)
+    result = _extract_data_from_previous_spreadsheet(
+        cell_data, CouncilMember.query.all()
+    )
 
     assert not result.column_data_by_legislator_id
     assert result.import_messages == [
         "Could not find a 'Name' column at the top of the old spreadsheet, so nothing was copied over"
     ]
+
+
+@patch("src.google_sheets.Credentials")
+@patch("src.google_sheets.build")
+def test_google_services_are_cached(mock_build, mock_credentials):
+    mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+
+    sheets_service = _get_sheets_service()
+    assert _get_sheets_service() is sheets_service
+    _get_drive_service()
+
+    assert mock_build.call_count == 2
+    mock_credentials.from_service_account_info.assert_called_once()
+
+    # Each thread gets its own services, but they share the credentials
+    other_thread_services = []
+    thread = Thread(
+        target=lambda: other_thread_services.append(_get_sheets_service())
+    )
+    thread.start()
+    thread.join()
+
+    assert other_thread_services[0] is not sheets_service
+    assert mock_build.call_count == 3
+    mock_credentials.from_service_account_info.assert_called_once()
+
+
+@patch("src.google_sheets.Credentials")
+@patch("src.google_sheets.build")
+def test_clear_google_services__clears_other_threads(
+    mock_build, mock_credentials
+):
+    mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+
+    # A long-lived thread, like the power hour executor's
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        service = executor.submit(_get_sheets_service).result()
+        assert executor.submit(_get_sheets_service).result() is service
+
+        google_sheets.clear_google_services()
+
+        assert executor.submit(_get_sheets_service).result() is not service
+    assert mock_credentials.from_service_account_info.call_count == 2
+
+
+@patch("src.google_sheets.Credentials")
+@patch("src.google_sheets.build")
+def test_generate_google_sheet__rows_need_no_queries(
+    mock_build, mock_credentials, city_bill
+):
+    for i in range(3):
+        person = Person(
+            id=uuid4(),
+            name=f"Council member {i}",
+            type=Person.PersonType.COUNCIL_MEMBER,
+        )
+        person.council_member = CouncilMember(city_council_person_id=i)
+        person.office_contacts.append(
+            OfficeContact(
+                type=OfficeContact.OfficeContactType.CENTRAL_OFFICE,
+                phone="111-222-3333",
+            )
+        )
+        staffer = Person(
+            id=uuid4(),
+            name=f"Staffer {i}",
+            type=Person.PersonType.STAFFER,
+        )
+        staffer.staffer = Staffer(boss_id=person.id)
+        staffer.office_contacts.append(
+            OfficeContact(
+                type=OfficeContact.OfficeContactType.DISTRICT_OFFICE,
+                phone="444-555-6666",
+            )
+        )
+        db.session.add_all([person, staffer])
+        if i == 0:
+            db.session.add(
+                CitySponsorship(
+                    council_member_id=person.id,
+                    bill_id=city_bill.id,
+                    sponsor_sequence=0,
+                )
+            )
+    db.session.commit()
+    db.session.expire_all()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    create_spreadsheet_data = google_sheets._create_phone_bank_spreadsheet_data
+
+    def create_spreadsheet_data_without_queries(*args):
+        event.listen(db.engine, "before_cursor_execute", record_statement)
+        try:
+            return create_spreadsheet_data(*args)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    with patch(
+        "src.google_sheets._create_phone_bank_spreadsheet_data",
+        create_spreadsheet_data_without_queries,
+    ):
+        create_power_hour(
+            city_bill.id,
+            title="Power hour",
+            old_spreadsheet_to_import=None,
+        )
+
+    assert statements == []
+
+
+@patch("src.google_sheets.Credentials")
+@patch("src.google_sheets.build")
+def test_generate_google_sheet__state_bill(
+    mock_build,
+    mock_credentials,
+    snapshot,
+    state_bill,
+    senator,
+    assembly_member,
+):
+    mock_sheets_service = MagicMock()
+    mock_build.return_value = mock_sheets_service
+
+    db.session.add(
+        SenateSponsorship(
+            bill_id=state_bill.id,
+            person_id=senator.id,
+            is_lead_sponsor=True,
+        )
+    )
+    db.session.commit()
+
+    mock_sheets_service.spreadsheets.return_value.get.return_value.execute.return_value = {
+        "sheets": [
+            {
+                "properties": {"title": "Senate"},
+                "data": [
+                    {
+                        "rowData": [
+                            {
+                                "values": [
+                                    {"formattedValue": "Name"},
+                                    {"formattedValue": "District"},
+                                    {"formattedValue": "Notes"},
+                                ]
+                            },
+                            {
+                                "values": [
+                                    {"formattedValue": "senator name (lead)"},
+                                    {"formattedValue": "3"},
+                                    {"formattedValue": "Called"},
+                                ]
+                            },
+                        ]
+                    }
+                ],
+            }
+        ]
+    }
+    mock_sheets_service.spreadsheets().create().execute.return_value = {
+        "spreadsheetId": "test_spreadsheet"
+    }
+
+    _, messages = create_power_hour(
+        state_bill.id,
+        title="State power hour",
+        old_spreadsheet_to_import="123",
+    )
+
+    assert messages == [
+        "Senate: Copied column 'Notes' to new sheet",
+        "Old spreadsheet has no Assembly tab, so nothing was copied to it",
+        "Spreadsheet was created",
+    ]
+
+    # Both tabs are created in one call
+    mock_sheets_service.spreadsheets().create.assert_called_with(body=snapshot)
+    body = mock_sheets_service.spreadsheets().create.call_args.kwargs["body"]
+    assert [sheet["properties"]["title"] for sheet in body["sheets"]] == [
+        "Senate",
+        "Assembly",
+    ]
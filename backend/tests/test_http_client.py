@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+import responses
+from freezegun import freeze_time
+from requests import HTTPError
+
+from src.http_client import HttpClient
+from src.response_cache import create_response_cache
+
+
+def make_client(cache=None):
+    return HttpClient(
+        "https://api.example.com/",
+        name="Test API",
+        default_params={"token": "abc"},
+        max_retries=2,
+        cache=cache,
+    )
+
+
+@responses.activate
+@patch("src.http_client.sleep")
+def test_retries_transient_errors(mock_sleep):
+    url = "https://api.example.com/things?token=abc"
+    responses.add(responses.GET, url=url, status=503)
+    responses.add(responses.GET, url=url, status=429)
+    responses.add(responses.GET, url=url, json={"ok": True})
+
+    client = make_client()
+
+    assert client.get("things") == {"ok": True}
+    assert mock_sleep.call_count == 2
+
+    stats = client.reset_stats()
+    assert stats.requests == 3
+    assert stats.retries == 2
+    assert stats.bytes_received == len(b'{"ok": true}')
+    assert client.stats.requests == 0
+
+
+@responses.activate
+@patch("src.http_client.sleep")
+def test_gives_up_after_max_retries(mock_sleep):
+    responses.add(
+        responses.GET,
+        url="https://api.example.com/things?token=abc",
+        status=500,
+    )
+
+    client = make_client()
+
+    with pytest.raises(HTTPError):
+        client.get("things")
+    assert client.stats.requests == 3
+
+
+@responses.activate
+@patch("src.http_client.sleep")
+def test_does_not_retry_client_errors(mock_sleep):
+    responses.add(
+        responses.GET,
+        url="https://api.example.com/things?token=abc&extra=1",
+        status=404,
+    )
+
+    client = make_client()
+
+    with pytest.raises(HTTPError):
+        client.get("things", params={"extra": 1})
+    mock_sleep.assert_not_called()
+    assert client.stats.requests == 1
+
+
+@responses.activate
+@pytest.mark.parametrize("use_sqlite", [False, True])
+def test_caches_responses(use_sqlite, tmp_path):
+    url = "https://api.example.com/things?token=abc&page=1"
+    responses.add(
+        responses.GET,
+        url=url,
+        json={"version": 1},
+        headers={"ETag": '"v1"'},
+    )
+    responses.add(responses.GET, url=url, status=304)
+
+    cache = create_response_cache(
+        tmp_path / "cache.sqlite3" if use_sqlite else None
+    )
+    client = make_client(cache)
+    ttl = timedelta(hours=1)
+
+    with freeze_time("2021-01-01 12:00:00"):
+        assert client.get("things", params={"page": 1}, cache_ttl=ttl) == {
+            "version": 1
+        }
+    with freeze_time("2021-01-01 12:30:00"):
+        assert client.get("things", params={"page": 1}, cache_ttl=ttl) == {
+            "version": 1
+        }
+    assert len(responses.calls) == 1
+
+    with freeze_time("2021-01-01 13:30:00"):
+        assert client.get("things", params={"page": 1}, cache_ttl=ttl) == {
+            "version": 1
+        }
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+    # The revalidation restarted the TTL
+    with freeze_time("2021-01-01 14:00:00"):
+        client.get("things", params={"page": 1}, cache_ttl=ttl)
+    assert len(responses.calls) == 2
+
+    stats = cache.reset_stats()
+    assert (stats.hits, stats.revalidations, stats.misses) == (2, 1, 1)
+
+
+@responses.activate
+def test_does_not_cache_without_ttl():
+    responses.add(
+        responses.GET,
+        url="https://api.example.com/things?token=abc",
+        json={"ok": True},
+    )
+
+    cache = create_response_cache()
+    client = make_client(cache)
+    client.get("things")
+    client.get("things")
+
+    assert len(responses.calls) == 2
+    assert cache.stats.misses == 0
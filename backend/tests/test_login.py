@@ -2,6 +2,8 @@ import json
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
+from src.email_outbox.models import OutboundEmail
+from src.email_outbox.outbox import drain_outbox
 from src.models import db
 from src.user.models import LoginLink
 
@@ -12,6 +14,16 @@ def test_create_login_link_success(mock_boto3_client, client, user_email):
         "/api/create-login-link", data={"email": user_email}
     )
     assert response.status_code == 200
+
+    # The email is only queued by the request
+    mock_boto3_client.send_email.assert_not_called()
+    queued_email = OutboundEmail.query.one()
+    assert queued_email.to_address == user_email
+    assert LoginLink.query.one().token in queued_email.body_text
+
+    mock_boto3_client.send_email.return_value = {"MessageId": "1"}
+    drain_outbox()
+
     mock_boto3_client.send_email.assert_called()
 
 
@@ -0,0 +1,37 @@
+from src.models import db
+from src.person.models import Person, Senator
+from src.person.sync import upsert_legislators
+
+
+def upsert_senators(values_by_member_id):
+    upsert_legislators(
+        representative_model=Senator,
+        key_column=Senator.state_member_id,
+        person_type=Person.PersonType.SENATOR,
+        values_by_key={
+            member_id: ({"name": name}, {"district": district})
+            for member_id, (name, district) in values_by_member_id.items()
+        },
+    )
+    db.session.commit()
+
+
+def test_upsert_legislators__updates_existing_rows(senator):
+    senator_id = senator.id
+
+    upsert_senators({50: ("Renamed", 4), 100: ("New senator", 10)})
+    upsert_senators({50: ("Renamed again", 5), 100: ("New senator", 11)})
+
+    assert Person.query.count() == 2
+    assert Senator.query.count() == 2
+
+    existing = Person.query.get(senator_id)
+    assert existing.name == "Renamed again"
+    assert existing.senator.district == 5
+    # Columns that weren't upserted are left alone
+    assert existing.email == "me@senate.com"
+
+    new = Senator.query.filter_by(state_member_id=100).one()
+    assert new.person.name == "New senator"
+    assert new.person.type == Person.PersonType.SENATOR
+    assert new.district == 11
@@ -1,7 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
+from uuid import uuid4
 
 from src.bill.models import PowerHour
 from src.models import db
+from src.power_hour_jobs.models import PowerHourJob
+from src.power_hour_jobs.runner import (
+    JOB_FAILED_ERROR,
+    STALE_JOB_TIMEOUT,
+    run_pending_power_hour_jobs,
+)
+from src.utils import now
 
 from .utils import get_response_data
 
@@ -31,7 +40,8 @@ def test_get_power_hours(client, city_bill):
     assert response_data[0]["createdAt"] == "2021-01-01T00:00:00+00:00"
 
 
-@patch("src.bill.views.create_power_hour")
+@patch("src.power_hour_jobs.runner.POWER_HOUR_JOB_RUNNER", "worker")
+@patch("src.power_hour_jobs.runner.create_power_hour")
 def test_create_power_hour__no_import(
     mock_create_power_hour, client, city_bill
 ):
@@ -45,8 +55,18 @@ def test_create_power_hour__no_import(
         data={"title": "My power hour"},
     )
 
+    # The spreadsheet isn't created until the job runs
+    assert response.status_code == 202
+    job_id = get_response_data(response)["id"]
+    assert get_response_data(response)["status"] == "PENDING"
+    mock_create_power_hour.assert_not_called()
+
+    assert run_pending_power_hour_jobs() == 1
+
+    response = client.get(f"/api/power-hour-jobs/{job_id}")
     assert response.status_code == 200
     response_data = get_response_data(response)
+    assert response_data["status"] == "SUCCEEDED"
     assert response_data["powerHour"]["title"] == "My power hour"
     assert response_data["messages"] == ["Power hour created"]
 
@@ -55,7 +75,8 @@ def test_create_power_hour__no_import(
     assert power_hour.spreadsheet_id == "1"
 
 
-@patch("src.bill.views.create_power_hour")
+@patch("src.power_hour_jobs.runner.POWER_HOUR_JOB_RUNNER", "worker")
+@patch("src.power_hour_jobs.runner.create_power_hour")
 def test_create_power_hour__with_import(
     mock_create_power_hour, client, city_bill
 ):
@@ -82,7 +103,89 @@ def test_create_power_hour__with_import(
         },
     )
 
-    assert response.status_code == 200
+    assert response.status_code == 202
+    run_pending_power_hour_jobs()
     mock_create_power_hour.assert_called_with(
         city_bill.id, "My power hour", "123"
     )
+
+
+@patch("src.power_hour_jobs.runner.create_power_hour")
+def test_create_power_hour__runs_in_background_thread(
+    mock_create_power_hour, client, city_bill
+):
+    mock_create_power_hour.return_value = (
+        {"spreadsheetId": 1, "spreadsheetUrl": "http://example.com"},
+        [],
+    )
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    with patch("src.power_hour_jobs.runner._executor", executor):
+        response = client.post(
+            f"/api/bills/{city_bill.id}/power-hours",
+            data={"title": "My power hour"},
+        )
+        executor.shutdown(wait=True)
+
+    job_id = get_response_data(response)["id"]
+    response = client.get(f"/api/power-hour-jobs/{job_id}")
+    assert get_response_data(response)["status"] == "SUCCEEDED"
+
+
+@patch("src.power_hour_jobs.runner.POWER_HOUR_JOB_RUNNER", "worker")
+@patch("src.power_hour_jobs.runner.create_power_hour")
+def test_create_power_hour__failure(mock_create_power_hour, client, city_bill):
+    mock_create_power_hour.side_effect = RuntimeError("Sheets is down")
+
+    response = client.post(
+        f"/api/bills/{city_bill.id}/power-hours",
+        data={"title": "My power hour"},
+    )
+    job_id = get_response_data(response)["id"]
+    run_pending_power_hour_jobs()
+
+    response = client.get(f"/api/power-hour-jobs/{job_id}")
+    response_data = get_response_data(response)
+    assert response_data["status"] == "FAILED"
+    # The exception is only logged
+    assert response_data["error"] == JOB_FAILED_ERROR
+    assert response_data["powerHour"] is None
+    assert PowerHour.query.count() == 0
+
+
+@patch("src.power_hour_jobs.runner.create_power_hour")
+def test_run_pending_power_hour_jobs__left_behind(
+    mock_create_power_hour, city_bill
+):
+    mock_create_power_hour.return_value = (
+        {"spreadsheetId": 1, "spreadsheetUrl": "http://example.com"},
+        [],
+    )
+    # Queued before a restart, and died while running, respectively
+    pending_job = PowerHourJob(bill_id=city_bill.id, title="Pending")
+    stale_job = PowerHourJob(
+        bill_id=city_bill.id,
+        title="Stale",
+        status=PowerHourJob.Status.RUNNING,
+        started_at=now() - STALE_JOB_TIMEOUT * 2,
+    )
+    running_job = PowerHourJob(
+        bill_id=city_bill.id,
+        title="Running",
+        status=PowerHourJob.Status.RUNNING,
+        started_at=now(),
+    )
+    db.session.add_all([pending_job, stale_job, running_job])
+    db.session.commit()
+
+    assert run_pending_power_hour_jobs() == 1
+
+    assert pending_job.status == PowerHourJob.Status.SUCCEEDED
+    assert stale_job.status == PowerHourJob.Status.FAILED
+    assert stale_job.error == JOB_FAILED_ERROR
+    assert running_job.status == PowerHourJob.Status.RUNNING
+
+
+def test_get_power_hour_job__not_found(client):
+    response = client.get(f"/api/power-hour-jobs/{uuid4()}")
+    assert response.status_code == 404
@@ -0,0 +1,86 @@
+from sqlalchemy import event, update
+
+from src.bill.models import Bill
+from src.models import db
+from src.resource_versions.models import ResourceVersion
+from src.sponsorship.models import SenateSponsorship
+
+
+def get_version(table_name):
+    resource_version = ResourceVersion.query.get(table_name)
+    return resource_version.version if resource_version else 0
+
+
+def test_get_bills__not_modified(client, state_bill):
+    response = client.get("/api/bills")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    assert "no-cache" in response.headers["Cache-Control"]
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.get("/api/bills", headers={"If-None-Match": etag})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    # One to check the user, and one for the resource versions
+    assert len(statements) == 2
+
+    response = client.get(
+        "/api/bills", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+
+def test_get_bills__modified_by_edit(client, state_bill):
+    etag = client.get("/api/bills").headers["ETag"]
+
+    response = client.put(
+        f"/api/bills/{state_bill.id}",
+        json={"notes": "notes", "nickname": "new", "twitterSearchTerms": []},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/bills", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # Unrelated tables don't change the ETag
+    etag = client.get("/api/persons").headers["ETag"]
+    response = client.get("/api/persons", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_statements_bump_versions(state_bill, senator):
+    version = get_version("senate_sponsorships")
+
+    db.session.add(
+        SenateSponsorship(
+            bill_id=state_bill.id, person_id=senator.id, is_lead_sponsor=True
+        )
+    )
+    db.session.commit()
+    assert get_version("senate_sponsorships") == version + 1
+
+    db.session.execute(update(SenateSponsorship).values(is_lead_sponsor=False))
+    db.session.commit()
+    assert get_version("senate_sponsorships") == version + 2
+
+
+def test_rolled_back_writes_dont_bump_versions(state_bill):
+    version = get_version("bills")
+
+    db.session.execute(update(Bill).values(notes="rolled back"))
+    db.session.rollback()
+    db.session.commit()
+
+    assert get_version("bills") == version
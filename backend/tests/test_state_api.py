@@ -1,13 +1,22 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
 import pytest
 import responses
+from freezegun import freeze_time
+from sqlalchemy import event
 
 from src.app import app
-from src.bill.models import Bill
+from src.bill.models import AssemblyBill, Bill, SenateBill, StateBill
 from src.models import db
 from src.person.models import AssemblyMember, Person, Senator
 from src.person.schema import PersonWithContactsSchema
 from src.sponsorship.models import AssemblySponsorship, SenateSponsorship
-from src.state_api import sync_state_representatives, update_state_bills
+from src.state_api import (
+    _add_chamber_sponsorships,
+    sync_state_representatives,
+    update_state_bills,
+)
 
 from .utils import create_mock_bill_response, get_response_data
 
@@ -258,3 +267,194 @@ def test_update_state_bills(state_bill: Bill, senator, assembly_member):
         == "Different assembly member"
     )
     assert assembly_sponsorship.is_lead_sponsor
+
+
+def test_add_chamber_sponsorships(state_bill: Bill, senator):
+    cosponsor = Person(name="Cosponsor", type=Person.PersonType.SENATOR)
+    cosponsor.senator = Senator(state_member_id=100)
+    db.session.add(cosponsor)
+    db.session.commit()
+    senator_id, cosponsor_id = senator.id, cosponsor.id
+    senate_bill = state_bill.state_bill.senate_bill
+
+    chamber_data = {
+        "activeVersion": "",
+        "sponsor": {"member": {"memberId": 50, "fullName": "senator name"}},
+        "amendments": {
+            "items": {
+                "": {
+                    "coSponsors": {
+                        "items": [
+                            {"memberId": 100, "fullName": "Cosponsor"},
+                            # Not a senator we know about, so skipped
+                            {"memberId": 999, "fullName": "Unknown"},
+                        ]
+                    }
+                }
+            }
+        },
+    }
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        _add_chamber_sponsorships(
+            chamber_bill=senate_bill,
+            chamber_data=chamber_data,
+            sponsorship_model=SenateSponsorship,
+            representative_model=Senator,
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    # One to look up the sponsors, and one to load the existing sponsorships
+    assert len(statements) == 2
+    assert sorted(
+        (s.person_id, s.is_lead_sponsor) for s in senate_bill.sponsorships
+    ) == sorted([(senator_id, True), (cosponsor_id, False)])
+
+
+@responses.activate
+@freeze_time("2021-05-01 17:00:00")
+@pytest.mark.parametrize("is_updated", [False, True])
+def test_update_state_bills__incremental(state_bill: Bill, is_updated):
+    state_bill.state_bill.synced_at = datetime(
+        2021, 5, 1, 16, tzinfo=timezone.utc
+    )
+    db.session.commit()
+
+    # The API expects New York time, starting from a bit before the last sync
+    updated_print_nos = ["S999"] + (["A1234"] if is_updated else [])
+    responses.add(
+        responses.GET,
+        url="https://legislation.nysenate.gov/api/3/bills/updates/2021-05-01T11:45:00/2021-05-01T13:00:00?limit=1000&offset=1&key=fake_key",
+        json={
+            "result": {
+                "items": [
+                    {"id": {"session": 2021, "basePrintNo": print_no}}
+                    for print_no in updated_print_nos
+                ]
+            },
+            "total": len(updated_print_nos),
+        },
+    )
+    for print_no, chamber in [("S1234", "SENATE"), ("A1234", "ASSEMBLY")]:
+        responses.add(
+            responses.GET,
+            url=f"https://legislation.nysenate.gov/api/3/bills/2021/{print_no}?view=no_fulltext&key=fake_key",
+            json=create_mock_bill_response(
+                base_print_no=print_no,
+                chamber=chamber,
+                cosponsor_member_id=1,
+                lead_sponsor_member_id=2,
+                status="New status",
+                same_as_base_print_no="A1234"
+                if chamber == "SENATE"
+                else "S1234",
+            ),
+        )
+
+    update_state_bills()
+    db.session.rollback()
+
+    assert len(responses.calls) == (3 if is_updated else 1)
+    expected_status = "New status" if is_updated else "Voted"
+    assert state_bill.state_bill.assembly_bill.status == expected_status
+    assert state_bill.state_bill.synced_at == datetime(
+        2021, 5, 1, 17, tzinfo=timezone.utc
+    )
+
+
+@responses.activate
+@freeze_time("2021-05-01 17:00:00")
+def test_update_state_bills__failed_bill_doesnt_hold_window_open(
+    state_bill: Bill,
+):
+    state_bill.state_bill.synced_at = datetime(
+        2021, 5, 1, 16, tzinfo=timezone.utc
+    )
+    # Failed to refresh in every run since this
+    failed_bill = Bill(
+        name="failed bill",
+        description="description",
+        type=Bill.BillType.STATE,
+    )
+    failed_bill.state_bill = StateBill(
+        session_year=2021,
+        synced_at=datetime(2021, 4, 1, tzinfo=timezone.utc),
+    )
+    failed_bill.state_bill.senate_bill = SenateBill(
+        base_print_no="S5", active_version="", status="Committee"
+    )
+    failed_bill.state_bill.assembly_bill = AssemblyBill(
+        base_print_no="A5", active_version="", status="Committee"
+    )
+    db.session.add(failed_bill)
+    db.session.commit()
+    state_bill_id, failed_bill_id = state_bill.id, failed_bill.id
+
+    # The window starts from the last run, not from the failed bill
+    responses.add(
+        responses.GET,
+        url="https://legislation.nysenate.gov/api/3/bills/updates/2021-05-01T11:45:00/2021-05-01T13:00:00?limit=1000&offset=1&key=fake_key",
+        json={"result": {"items": []}, "total": 0},
+    )
+    for print_no, chamber in [("S5", "SENATE"), ("A5", "ASSEMBLY")]:
+        responses.add(
+            responses.GET,
+            url=f"https://legislation.nysenate.gov/api/3/bills/2021/{print_no}?view=no_fulltext&key=fake_key",
+            json=create_mock_bill_response(
+                base_print_no=print_no,
+                chamber=chamber,
+                cosponsor_member_id=1,
+                lead_sponsor_member_id=2,
+                status="New status",
+                same_as_base_print_no="A5" if chamber == "SENATE" else "S5",
+            ),
+        )
+
+    update_state_bills()
+    db.session.rollback()
+
+    assert len(responses.calls) == 3
+    unchanged = StateBill.query.get(state_bill_id)
+    retried = StateBill.query.get(failed_bill_id)
+    assert unchanged.assembly_bill.status == "Voted"
+    assert retried.assembly_bill.status == "New status"
+    for bill in [unchanged, retried]:
+        assert bill.synced_at == datetime(2021, 5, 1, 17, tzinfo=timezone.utc)
+
+
+@responses.activate
+@patch("src.http_client.sleep")
+def test_update_state_bills__fetch_failure_skips_bill(
+    mock_sleep, state_bill: Bill
+):
+    responses.add(
+        responses.GET,
+        url="https://legislation.nysenate.gov/api/3/bills/2021/S1234?view=no_fulltext&key=fake_key",
+        status=500,
+    )
+    responses.add(
+        responses.GET,
+        url="https://legislation.nysenate.gov/api/3/bills/2021/A1234?view=no_fulltext&key=fake_key",
+        json=create_mock_bill_response(
+            base_print_no="A1234",
+            chamber="ASSEMBLY",
+            cosponsor_member_id=1,
+            lead_sponsor_member_id=2,
+            status="New status",
+            same_as_base_print_no="S1234",
+        ),
+    )
+
+    update_state_bills()
+    db.session.rollback()
+
+    # Neither chamber is written, so the bill is retried next time
+    assert state_bill.state_bill.assembly_bill.status == "Voted"
+    assert state_bill.state_bill.synced_at is None
@@ -1,12 +1,21 @@
 import json
+from datetime import datetime, timezone
 from uuid import uuid4
 
 import pytest
 import responses
-
-from src.bill.models import AssemblyBill, Bill, SenateBill, StateBill
+from sqlalchemy import event
+
+from src.bill.models import (
+    AssemblyBill,
+    Bill,
+    BillSnapshot,
+    SenateBill,
+    StateBill,
+)
 from src.models import db
 from src.person.models import AssemblyMember, Person, Senator
+from src.sponsorship.models import AssemblySponsorship, SenateSponsorship
 
 from .utils import assert_response, create_mock_bill_response
 
@@ -58,6 +67,134 @@ def test_get_bills(client, state_bill):
     )
 
 
+def test_get_bills__sponsor_counts_in_one_query(
+    client, state_bill, city_bill, senator, assembly_member
+):
+    db.session.add_all(
+        [
+            SenateSponsorship(
+                bill_id=state_bill.id,
+                person_id=senator.id,
+                is_lead_sponsor=True,
+            ),
+            AssemblySponsorship(
+                bill_id=state_bill.id,
+                person_id=assembly_member.id,
+                is_lead_sponsor=True,
+            ),
+        ]
+    )
+    db.session.commit()
+
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.get("/api/bills")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    response_data = json.loads(response.data)
+    [state_bill_data] = [b for b in response_data if b["type"] == "STATE"]
+    assert state_bill_data["stateBill"]["senateBill"]["sponsorCount"] == 1
+    assert state_bill_data["stateBill"]["assemblyBill"]["sponsorCount"] == 1
+    [city_bill_data] = [b for b in response_data if b["type"] == "CITY"]
+    assert city_bill_data["cityBill"]["sponsorCount"] == 0
+
+    # One to check the user, one for the resource versions, and one for the
+    # bills
+    assert len(statements) == 3
+
+
+def test_get_bills__pages(client, state_bill, city_bill):
+    response = client.get("/api/bills?limit=1&fields=id,name")
+    assert_response(response, 200, [{"id": str(city_bill.id), "name": "name"}])
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/bills?limit=1&fields=id,name&after={cursor}")
+    assert_response(
+        response, 200, [{"id": str(state_bill.id), "name": "state bill"}]
+    )
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/api/bills?after=not-a-cursor")
+    assert response.status_code == 422
+
+
+def test_get_bills__filters(client, state_bill, city_bill):
+    def get_bill_ids(query):
+        response = client.get(f"/api/bills?fields=id&{query}")
+        assert response.status_code == 200
+        return [bill["id"] for bill in json.loads(response.data)]
+
+    state_bill_id = str(state_bill.id)
+    city_bill_id = str(city_bill.id)
+
+    assert get_bill_ids("type=CITY") == [city_bill_id]
+    assert get_bill_ids("sessionYear=2021") == [state_bill_id]
+    assert get_bill_ids("sessionYear=2023") == []
+    assert get_bill_ids("status=Voted") == [state_bill_id]
+    assert get_bill_ids("status=Enacted") == [city_bill_id]
+
+    db.session.add(
+        BillSnapshot(
+            bill_id=state_bill_id,
+            chamber=BillSnapshot.Chamber.SENATE,
+            status="Committee",
+            sponsor_person_ids=[],
+            content_hash="hash",
+            updated_at=datetime(2021, 6, 1, tzinfo=timezone.utc),
+        )
+    )
+    db.session.commit()
+    assert get_bill_ids("changedSince=2021-05-01T00:00:00Z") == [state_bill_id]
+    assert get_bill_ids("changedSince=2021-07-01T00:00:00Z") == []
+
+    assert client.get("/api/bills?fields=unknown").status_code == 422
+    assert client.get("/api/bills?type=COUNTY").status_code == 422
+
+
+def test_get_bills__fields_without_chambers_need_one_query(
+    client, state_bill, city_bill
+):
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        response = client.get("/api/bills?fields=id,name,nickname,type")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    assert_response(
+        response,
+        200,
+        [
+            {
+                "id": str(city_bill.id),
+                "name": "name",
+                "nickname": "nickname",
+                "type": "CITY",
+            },
+            {
+                "id": str(state_bill.id),
+                "name": "state bill",
+                "nickname": "nickname",
+                "type": "STATE",
+            },
+        ],
+    )
+    # One to check the user, one for the resource versions, and one for the
+    # bills
+    assert len(statements) == 3
+    assert "sponsorships" not in statements[2]
+
+
 def test_delete_bill(client, state_bill):
     response = client.get("/api/bills")
     assert response.status_code == 200
@@ -78,3 +78,42 @@ def test_state_data_sync__not_found(senator, assembly_member):
 
     assert senator.email == original_senator_email
     assert assembly_member.email == original_assembly_email
+
+
+def test_state_data_sync__only_changed_contacts_are_written(senator):
+    original_contact = senator.office_contacts[0]
+    original_contact_id = original_contact.id
+
+    fill_static_state_data(
+        senate_data_by_member_id={
+            senator.senator.state_member_id: {
+                "email": senator.email,
+                "party": senator.party,
+                "albany_contact": [
+                    {
+                        "phone": original_contact.phone,
+                        "city": original_contact.city,
+                        "fax": original_contact.fax,
+                    }
+                ],
+                "district_contact": [
+                    {"phone": "555-555-5555", "city": "Brooklyn"}
+                ],
+            },
+        },
+        assembly_data_by_member_id={},
+    )
+
+    db.session.rollback()
+
+    contacts_by_type = {c.type: c for c in senator.office_contacts}
+    assert len(senator.office_contacts) == 2
+    assert (
+        contacts_by_type[OfficeContact.OfficeContactType.CENTRAL_OFFICE].id
+        == original_contact_id
+    )
+    district_contact = contacts_by_type[
+        OfficeContact.OfficeContactType.DISTRICT_OFFICE
+    ]
+    assert district_contact.phone == "555-555-5555"
+    assert district_contact.city == "Brooklyn"
@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 from src.models import db
 from src.user.models import User
 
@@ -18,6 +20,8 @@ def test_get_users(client, user_id, user_name, user_email):
                 "id": str(user_id),
                 "name": "Test user",
                 "sendBillUpdateNotifications": False,
+                "notificationFrequency": "IMMEDIATE",
+                "notificationSubscriptions": [],
             }
         ],
     )
@@ -76,6 +80,8 @@ def test_get_viewer(client, user_id, user_email):
             "id": str(user_id),
             "name": "Test user",
             "sendBillUpdateNotifications": False,
+            "notificationFrequency": "IMMEDIATE",
+            "notificationSubscriptions": [],
         },
     )
 
@@ -96,3 +102,54 @@ def test_update_viewer(client, user_id):
 
     user = User.query.get(user_id)
     assert user.send_bill_update_notifications
+
+
+def test_update_viewer__notification_settings(client, user_id, city_bill):
+    bill_id = str(city_bill.id)
+    response = client.put(
+        "/api/viewer",
+        data={
+            "sendBillUpdateNotifications": True,
+            "notificationFrequency": "DAILY_DIGEST",
+            "notificationSubscriptions": [
+                {"billId": bill_id, "chamber": None},
+                {"chamber": "SENATE"},
+            ],
+        },
+    )
+    assert response.status_code == 200
+
+    # Their first digest waits for the next scheduled one
+    assert User.query.get(user_id).last_digest_sent_at
+
+    response = client.get("/api/viewer")
+    assert response.json["notificationFrequency"] == "DAILY_DIGEST"
+    assert sorted(
+        response.json["notificationSubscriptions"],
+        key=lambda s: s["chamber"] or "",
+    ) == [
+        {"billId": bill_id, "chamber": None},
+        {"billId": None, "chamber": "SENATE"},
+    ]
+
+
+def test_update_viewer__empty_subscription(client):
+    response = client.put(
+        "/api/viewer",
+        data={
+            "sendBillUpdateNotifications": True,
+            "notificationSubscriptions": [{}],
+        },
+    )
+    assert response.status_code == 422
+
+
+def test_update_viewer__unknown_bill_subscription(client):
+    response = client.put(
+        "/api/viewer",
+        data={
+            "sendBillUpdateNotifications": True,
+            "notificationSubscriptions": [{"billId": str(uuid4())}],
+        },
+    )
+    assert response.status_code == 422
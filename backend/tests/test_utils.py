@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+from src.utils import RateLimiter, fetch_concurrently
+
+
+def test_fetch_concurrently__isolates_errors():
+    def fetch(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item * 10
+
+    results, errors = fetch_concurrently(fetch, [1, 2, 3], max_workers=2)
+
+    assert results == {1: 10, 3: 30}
+    assert list(errors.keys()) == [2]
+    assert isinstance(errors[2], ValueError)
+
+
+@patch("src.utils.sleep")
+@patch("src.utils.monotonic", return_value=100)
+def test_rate_limiter__spaces_out_calls(mock_monotonic, mock_sleep):
+    rate_limiter = RateLimiter(max_per_second=4)
+
+    for _ in range(3):
+        rate_limiter.wait()
+
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.25, 0.5]
+
+
+@patch("src.utils.sleep")
+def test_rate_limiter__unlimited(mock_sleep):
+    rate_limiter = RateLimiter()
+
+    for _ in range(3):
+        rate_limiter.wait()
+
+    mock_sleep.assert_not_called()
@@ -20,7 +20,9 @@ export default function BillListPage(): ReactElement {
   const apiFetch = useApiFetch();
 
   function loadBillList() {
-    apiFetch('/api/bills').then((response) => {
+    apiFetch(
+      '/api/bills?fields=id,name,nickname,type,cityBill,stateBill'
+    ).then((response) => {
       setBills(response);
     });
   }
@@ -1,7 +1,7 @@
 import React, { useState, useRef, ReactElement } from 'react';
 import Form from 'react-bootstrap/Form';
 import Button from 'react-bootstrap/Button';
-import { Bill, CreatePowerHourResponse, PowerHour } from './types';
+import { Bill, PowerHour, PowerHourJob } from './types';
 import Modal from 'react-bootstrap/Modal';
 import useApiFetch from './useApiFetch';
 import { MdHelpOutline } from 'react-icons/md';
@@ -27,6 +27,9 @@ interface BodyProps {
 
 const DO_NOT_IMPORT_VALUE = 'none';
 
+// How often to check whether the spreadsheet has been created
+const JOB_POLL_INTERVAL_MS = 1000;
+
 // Separate the body out from the modal so that it's recreated whenever the modal
 // disappears and reappears (in order to refresh its state).
 function PowerHourModalBody(props: BodyProps): ReactElement {
@@ -42,6 +45,9 @@ function PowerHourModalBody(props: BodyProps): ReactElement {
   const [powerHourResult, setPowerHourResult] = useState<PowerHour | null>(
     null
   );
+  const [createPowerHourError, setCreatePowerHourError] = useState<
+    string | null
+  >(null);
   const [importHelpShown, setImportHelpShown] = useState<boolean>(false);
 
   // Once modal opens, don't refresh the list of old power hours. Otherwise,
@@ -56,11 +62,30 @@ function PowerHourModalBody(props: BodyProps): ReactElement {
   } (${moment().format('MMM D YYYY')})`;
   const lastWeekText = moment().subtract(7, 'days').format('MM/D');
 
+  // The spreadsheet is created in the background, so keep checking on the
+  // job until it's done
+  function handleJobUpdate(job: PowerHourJob) {
+    if (job.status === 'SUCCEEDED') {
+      setCreatePowerHourMessages(job.messages);
+      setCreatePowerHourInProgress(false);
+      setPowerHourResult(job.powerHour);
+      props.handlePowerHourCreated();
+    } else if (job.status === 'FAILED') {
+      setCreatePowerHourInProgress(false);
+      setCreatePowerHourError(job.error || 'Something went wrong');
+    } else {
+      setTimeout(() => {
+        apiFetch(`/api/power-hour-jobs/${job.id}`).then(handleJobUpdate);
+      }, JOB_POLL_INTERVAL_MS);
+    }
+  }
+
   function handleSubmit(e: any) {
     const title = titleRef.current!.value;
     const selectValue = selectRef.current!.value;
 
     setCreatePowerHourInProgress(true);
+    setCreatePowerHourError(null);
     apiFetch(`/api/bills/${props.bill.id}/power-hours`, {
       method: 'POST',
       body: {
@@ -68,12 +93,7 @@ function PowerHourModalBody(props: BodyProps): ReactElement {
         powerHourIdToImport:
           selectValue !== DO_NOT_IMPORT_VALUE ? selectValue : null
       }
-    }).then((response: CreatePowerHourResponse) => {
-      setCreatePowerHourMessages(response.messages);
-      setCreatePowerHourInProgress(false);
-      setPowerHourResult(response.powerHour);
-      props.handlePowerHourCreated();
-    });
+    }).then(handleJobUpdate);
 
     e.preventDefault();
   }
@@ -175,6 +195,12 @@ function PowerHourModalBody(props: BodyProps): ReactElement {
         </Form.Select>
       </Form.Group>
 
+      {createPowerHourError && (
+        <Alert variant="danger">
+          Could not create the spreadsheet: {createPowerHourError}
+        </Alert>
+      )}
+
       {powerHourResult ? (
         <>
           <Alert variant="primary">
@@ -136,9 +136,12 @@ export interface PowerHour {
   createdAt: string; // ISO DateTime
 }
 
-export interface CreatePowerHourResponse {
+export interface PowerHourJob {
+  id: Uuid;
+  status: 'PENDING' | 'RUNNING' | 'SUCCEEDED' | 'FAILED';
   messages: string[];
-  powerHour: PowerHour;
+  error: string | null;
+  powerHour: PowerHour | null;
 }
 
 export interface User {